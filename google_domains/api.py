@@ -2,22 +2,89 @@
     CRUD operations for Google Domains
 """
 import time
-from typing import Dict
+from typing import Dict, List, NamedTuple, Optional
 from selenium.common.exceptions import StaleElementReferenceException
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from splinter import Browser
 from splinter.element_list import ElementList
 from splinter.driver.webdriver import WebDriverElement
 from tabulate import tabulate
+from google_domains.cdp import (
+    CdpBrowser,
+    cdp_add,
+    cdp_del,
+    cdp_login,
+    cdp_records_html,
+    cdp_wait_for_tag,
+)
+from google_domains.inventory import record_snapshot
+from google_domains.latency import measure_latency
 from google_domains.log import debug, error, is_verbose
+from google_domains.processes import get_driver_pids, reap_processes
+from google_domains.scripts import (
+    MUTATION_OUTCOME,
+    SECTION_FINGERPRINT,
+    SYNTHETIC_RECORDS_HTML,
+)
 from google_domains.utils import fqdn, un_fqdn, print_timing
 
 
 # How many times to retry DOM errors. Reasonably large, somewhat arbitrary
 DOM_MAX_ATTEMPTS = 10
 
+# How long a save gets to succeed or fail, before its given up on
+OUTCOME_TIMEOUT_SECONDS = 120
+
+# How long a confirmation dialog can stay open after its button was clicked
+MODAL_GRACE_SECONDS = 5
+
+# Text that marks a notification or banner as a failure. Lowercase
+ERROR_SIGNALS = [
+    "error",
+    "invalid",
+    "already exists",
+    "could not",
+    "couldn't",
+    "failed",
+    "limit",
+    "quota",
+    "try again",
+]
+
+# Notifications, alert banners, and inputs that failed validation, in one round trip
+OUTCOME_XPATH = (
+    "//a[contains(., 'Dismiss')] | //*[@role='alert'] | //input[@aria-invalid='true']"
+)
+
+DELETE_MODAL_TITLE = "Delete synthetic record?"
+
+
+class Outcome(NamedTuple):
+    """ How a save ended. signal is "success", or the failure that showed up first:
+        "error" (a banner), "invalid" (an input), "modal" (still open) or "timeout"
+    """
+
+    signal: str
+    message: str = ""
+
+    @property
+    def ok(self) -> bool:
+        """ Did the save succeed?
+        """
+        return self.signal == "success"
+
+
+class MutationError(RuntimeError):
+    """ The registrar rejected a save
+    """
+
+    def __init__(self, outcome: Outcome) -> None:
+        super().__init__(f"Save failed ({outcome.signal}): {outcome.message}")
+        self.outcome = outcome
+
 
 @print_timing
+@measure_latency("login")
 def api_construct(
     domain: str, username: str, password: str, browser_name: str = "firefox"
 ) -> Browser:
@@ -26,6 +93,11 @@ def api_construct(
     """
 
     headless = not is_verbose()
+    if browser_name == "cdp":
+        browser = CdpBrowser(headless=headless)
+        cdp_login(browser, domain, username, password)
+        return browser
+
     if browser_name == "chrome":
 
         # need this to run as root in a container
@@ -40,7 +112,7 @@ def api_construct(
         browser = Browser(browser_name, headless=headless)
 
     else:
-        raise RuntimeError(f"Unsupported browser: {browser}")
+        raise RuntimeError(f"Unsupported browser: {browser_name}")
 
     browser.visit("https://domains.google.com/registrar/")
 
@@ -63,15 +135,30 @@ def api_construct(
 
 def api_destruct(browser: Browser) -> None:
     """ Lifecycle end
+        Reaps any driver or browser processes that outlive quit()
     """
     if browser:
-        browser.quit()
+        pids = get_driver_pids(browser)
+        try:
+            browser.quit()
+        finally:
+            reap_processes(pids)
 
 
-def api_ls(browser: Browser, domain: str) -> None:
+def api_ls(
+    browser: Browser,
+    domain: str,
+    match: Optional[str] = None,
+    target_match: Optional[str] = None,
+) -> None:
     """ Prints the current list of redirects
+        match is a hostname glob, and target_match a target regex. Both are optional
     """
-    entries = gdomain_ls(browser, domain)
+    if match or target_match:
+        entries = gdomain_ls_matching(browser, domain, match, target_match)
+    else:
+        entries = gdomain_ls(browser, domain)
+        record_snapshot(domain, entries)
 
     # Convert it to a list of lists, tabulate handles this natively
     array = []
@@ -122,14 +209,44 @@ def api_del(browser: Browser, domain: str, hostname: str) -> None:
 
 
 @print_timing
+@measure_latency("ls", listing=True)
 def gdomain_ls(browser: Browser, domain: str) -> Dict[str, str]:
     """ Returns a dict of hostnames to targets
     """
-    records = get_synthetic_records_div(browser)
-    divs = records.find_by_xpath(f"//div[contains(text(), '{domain}')]")
+    if isinstance(browser, CdpBrowser):
+        htmls = cdp_records_html(browser, domain)
+    else:
+        records = get_synthetic_records_div(browser)
+        divs = records.find_by_xpath(f".//div[contains(text(), '{domain}')]")
+        htmls = [div.html for div in divs]
+
+    return parse_records(htmls, domain)
+
+
+@print_timing
+@measure_latency("ls_matching")
+def gdomain_ls_matching(
+    browser: Browser, domain: str, match: Optional[str], target_match: Optional[str]
+) -> Dict[str, str]:
+    """ Returns a dict of the hostnames that match the glob, to targets that match the regex
+        The filters run in the page, so only matching rows cross the WebDriver boundary
+    """
+    hostname_regex = glob_to_regex(match) if match else None
+    if isinstance(browser, CdpBrowser):
+        htmls = cdp_records_html(browser, domain, hostname_regex, target_match)
+    else:
+        htmls = browser.execute_script(
+            SYNTHETIC_RECORDS_HTML, domain, hostname_regex, target_match
+        )
+    return parse_records(htmls, domain)
+
+
+def parse_records(htmls: List[str], domain: str) -> Dict[str, str]:
+    """ Returns a dict of hostnames to targets, from the record divs' html
+    """
     ret = {}
-    for div in divs:
-        arr = div.html.split()
+    for html in htmls:
+        arr = html.split()
         hostname = arr[0]
         target = arr[-1]
 
@@ -145,11 +262,27 @@ def gdomain_ls(browser: Browser, domain: str) -> Dict[str, str]:
 
 
 @print_timing
+@measure_latency("add")
 def gdomain_add(browser: Browser, domain: str, hostname: str, target: str) -> None:
     """ Adds a redirect from the hostname to the target url
     """
     hostname = un_fqdn(fqdn(hostname, domain), domain)  # make sure hostname is good
 
+    if isinstance(browser, CdpBrowser):
+        cdp_add(browser, hostname, target)
+        wait_for_success_notification(browser)
+        return
+
+    gdomain_add_prepare(browser, domain, hostname, target)
+    gdomain_add_submit(browser)
+    wait_for_success_notification(browser)
+
+
+def gdomain_add_prepare(browser: Browser, domain: str, hostname: str, target: str) -> None:
+    """ Fills in the add form, without submitting it
+    """
+    hostname = un_fqdn(fqdn(hostname, domain), domain)  # make sure hostname is good
+
     records = get_synthetic_records_div(browser)
     get_element_by_placeholder(records, "Subdomain").fill(hostname)
     get_element_by_placeholder(records, "Destination URL").fill(target)
@@ -158,23 +291,52 @@ def gdomain_add(browser: Browser, domain: str, hostname: str, target: str) -> No
     records.find_by_text("Forward path").click()
     records.find_by_text("Enable SSL").click()
 
+
+def gdomain_add_submit(browser: Browser) -> None:
+    """ Submits the prepared add form. Doesnt wait for it to save
+    """
+    records = get_synthetic_records_div(browser)
     button = records.find_by_text("Add")
     button.click()
 
-    wait_for_success_notification(browser)
+
+def get_add_form_values(browser: Browser) -> List[str]:
+    """ Returns the add form's subdomain and destination, as they are now
+    """
+    records = get_synthetic_records_div(browser)
+    return [
+        get_element_by_placeholder(records, "Subdomain").value or "",
+        get_element_by_placeholder(records, "Destination URL").value or "",
+    ]
 
 
 @print_timing
+@measure_latency("del")
 def gdomain_del(browser: Browser, domain: str, hostname: str) -> None:
     """ Deletes the passed-in hostname from Google Domains
         WARNING: THIS SEEMS BRITTLE
     """
     hostname = fqdn(hostname, domain)
 
+    if isinstance(browser, CdpBrowser):
+        cdp_del(browser, hostname)
+        wait_for_success_notification(browser, DELETE_MODAL_TITLE)
+        return
+
+    gdomain_del_prepare(browser, domain, hostname)
+    gdomain_del_submit(browser)
+    wait_for_success_notification(browser, DELETE_MODAL_TITLE)
+
+
+def gdomain_del_prepare(browser: Browser, domain: str, hostname: str) -> None:
+    """ Opens the hostname's delete confirmation, without confirming it
+    """
+    hostname = fqdn(hostname, domain)
+
     # find the right div for this hostname
     records = get_synthetic_records_div(browser)
     # xpath = "//div[contains(@class, 'H2OGROB-d-t')]"
-    xpath = f"//div[contains(text(), '{hostname}')]/../.."
+    xpath = f".//div[contains(text(), '{hostname}')]/../.."
     divs = records.find_by_xpath(xpath)
     div = divs.first
 
@@ -183,16 +345,47 @@ def gdomain_del(browser: Browser, domain: str, hostname: str) -> None:
     delete_button.click()
 
     # wait for the modal dialog
-    wait_for_tag(browser, "h3", "Delete synthetic record?")
+    wait_for_tag(browser, "h3", DELETE_MODAL_TITLE)
 
+
+def gdomain_del_submit(browser: Browser) -> None:
+    """ Confirms the open delete dialog. Doesnt wait for it to save
+    """
     # get the form element for the modal dialog
-    modal_form = get_element_by_substring(
-        "Delete synthetic record?", browser.find_by_tag("form")
-    )
+    modal_form = get_element_by_substring(DELETE_MODAL_TITLE, browser.find_by_tag("form"))
     modal_button = get_element_by_substring("Delete", modal_form.find_by_tag("button"))
     modal_button.click()
 
-    wait_for_success_notification(browser)
+
+@measure_latency("fingerprint")
+def gdomain_fingerprint(browser: Browser) -> Optional[str]:
+    """ Returns a fingerprint of the "Synthetic records" section, in one round trip
+        It changes whenever the records do. Much cheaper than gdomain_ls
+    """
+    return browser.execute_script(SECTION_FINGERPRINT, "Synthetic records")
+
+
+def gdomain_reload(browser: Browser) -> None:
+    """ Reloads the DNS page, to pick up changes made elsewhere
+    """
+    browser.reload()
+    wait_for_tag(browser, "h3", "Synthetic records")
+
+
+def glob_to_regex(pattern: str) -> str:
+    """ Returns a regex, in the syntax both Python and javascript share, for the glob
+    """
+    ret = ""
+    for char in pattern:
+        if char == "*":
+            ret += ".*"
+        elif char == "?":
+            ret += "."
+        elif char.isalnum() or char in "-_":
+            ret += char
+        else:
+            ret += "\\" + char
+    return f"^{ret}$"
 
 
 def get_synthetic_records_div(browser: Browser) -> WebDriverElement:
@@ -227,11 +420,98 @@ def get_element_by_placeholder(
     raise RuntimeError(f"Placeholder element not found: {placeholder}")
 
 
-def wait_for_success_notification(browser: Browser) -> None:
-    """ Wait until we get the success message
-        TODO: What if it fails?
+def count_notifications(browser: Browser) -> int:
+    """ Returns how many success notifications are showing
+    """
+    return sum(1 for x in browser.find_by_xpath("//a") if "Dismiss" in x.html and x.visible)
+
+
+def dismiss_notifications(browser: Browser) -> None:
+    """ Dismisses every showing notification, so the next one can be told apart
+    """
+    for element in browser.find_by_xpath("//a"):
+        if "Dismiss" in element.html and element.visible:
+            element.click()
+
+
+def wait_for_success_notification(browser: Browser, modal: Optional[str] = None) -> Outcome:
+    """ Waits for the save to succeed, and raises MutationError as soon as it fails
+        modal is the title of the confirmation dialog the save should close, if any
     """
-    wait_for_tag(browser, "a", "Dismiss")
+    outcome = wait_for_outcome(browser, modal)
+    if not outcome.ok:
+        raise MutationError(outcome)
+    return outcome
+
+
+@print_timing
+def wait_for_outcome(
+    browser: Browser, modal: Optional[str] = None, timeout: float = OUTCOME_TIMEOUT_SECONDS
+) -> Outcome:
+    """ Races the success notification against the failure signals
+        Returns whichever shows up first, instead of waiting on success alone
+    """
+    debug("   wait: outcome")
+    started = time.time()
+    attempts = 0
+    while True:
+        try:
+            outcome = get_outcome(browser)
+        except StaleElementReferenceException:
+            # NOTE: the notifications come and go while we look at them
+            attempts += 1
+            if attempts == DOM_MAX_ATTEMPTS:
+                raise
+            continue
+
+        elapsed = time.time() - started
+        if not outcome and modal and elapsed > MODAL_GRACE_SECONDS:
+            if does_element_exist(browser, "h3", modal):
+                outcome = Outcome("modal", f"{modal} is still open")
+        if not outcome and elapsed > timeout:
+            outcome = Outcome("timeout", f"Nothing after {timeout}s")
+
+        if outcome:
+            debug(f"  found: outcome {outcome.signal} {outcome.message}")
+            return outcome
+
+        debug("  sleep: outcome")
+        time.sleep(0.5)
+
+
+def get_outcome(browser: Browser) -> Optional[Outcome]:
+    """ Returns the outcome showing right now, or None if theres none yet
+        Failures win over success, in case a failure comes with its own Dismiss link
+    """
+    if isinstance(browser, CdpBrowser):
+        found = browser.execute_script(MUTATION_OUTCOME, ERROR_SIGNALS)
+        return Outcome(*found) if found else None
+
+    ret = None
+    for element in browser.find_by_xpath(OUTCOME_XPATH):
+        if not element.visible:
+            continue
+
+        if element.tag_name == "input":
+            return Outcome("invalid", element["placeholder"] or element["name"] or "")
+
+        # a Dismiss link speaks for its whole notification
+        if element.tag_name == "a":
+            element = element.find_by_xpath("..").first
+        text = element.text.strip()
+        if is_error_text(text):
+            return Outcome("error", text)
+        if "Dismiss" in text:
+            ret = Outcome("success", text)
+
+    return ret
+
+
+def is_error_text(text: str) -> bool:
+    """ Does the notification or banner text read as a failure?
+    """
+    text = text.lower()
+    return any(x in text for x in ERROR_SIGNALS)
 
 
 @print_timing
@@ -239,6 +519,10 @@ def wait_for_tag(browser: Browser, tag: str, substring: str) -> None:
     """ Waits indefinitely for the string to appear in the
         This is faster than the wait_for method, if we happen to know what tag we're looking for
     """
+    if isinstance(browser, CdpBrowser):
+        cdp_wait_for_tag(browser, tag, substring)
+        return
+
     debug(f"   wait: ({tag}) {substring}")
 
     attempts = 0
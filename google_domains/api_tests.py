@@ -1,14 +1,19 @@
 """
     api tests
 """
+import os.path
 from mock import MagicMock, patch  # create_autospec
+import pytest
 from google_domains import api as test
+from google_domains.cdp import CdpBrowser
+from google_domains.replay import ReplayBrowser, load_fixture
 
 
 PACKAGE = "google_domains.api."
 SAMPLE_TLD = "foobar.com"
 SAMPLE_HOSTNAME = f"baz.{SAMPLE_TLD}"
 SAMPLE_TARGET = "https://dweeb.com"
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "dns.html")
 
 
 def reset_mocks(*mocks) -> None:
@@ -27,9 +32,22 @@ def test_api_destruct():
     test.api_destruct(browser)
     assert browser_quit.call_count == 1
 
+    # leftover driver processes get reaped, even if quit fails
+    browser_quit.side_effect = Exception("already dead")
+    with patch(PACKAGE + "get_driver_pids") as get_driver_pids:
+        with patch(PACKAGE + "reap_processes") as reap_processes:
+            get_driver_pids.return_value = [123]
+            with pytest.raises(Exception):
+                test.api_destruct(browser)
+            assert reap_processes.call_args[0][0] == [123]
 
+    # nothing to destruct
+    test.api_destruct(None)
+
+
+@patch(PACKAGE + "record_snapshot")
 @patch(PACKAGE + "gdomain_ls")
-def test_api_ls(gdomain_ls, capsys):
+def test_api_ls(gdomain_ls, record_snapshot, capsys):
     """ Test api_ls
     """
 
@@ -37,11 +55,35 @@ def test_api_ls(gdomain_ls, capsys):
     gdomain_ls.return_value = {SAMPLE_HOSTNAME: SAMPLE_TARGET}
     test.api_ls(None, SAMPLE_TLD)
     assert gdomain_ls.call_count == 1
+    assert record_snapshot.call_args[0] == (SAMPLE_TLD, {SAMPLE_HOSTNAME: SAMPLE_TARGET})
     out, __ = capsys.readouterr()
     assert SAMPLE_HOSTNAME in out
     assert "dweeb.com" in out
 
 
+@patch(PACKAGE + "record_snapshot")
+@patch(PACKAGE + "gdomain_ls")
+def test_api_ls_matching(gdomain_ls, record_snapshot, capsys):
+    """ Test api_ls with filters, which run in the page
+    """
+    browser = MagicMock()
+    browser.execute_script.return_value = [f"{SAMPLE_HOSTNAME} → {SAMPLE_TARGET}"]
+
+    test.api_ls(browser, SAMPLE_TLD, match="baz*", target_match="dweeb")
+    assert browser.execute_script.call_args[0][1:] == (SAMPLE_TLD, "^baz.*$", "dweeb")
+    assert gdomain_ls.call_count == 0
+    assert record_snapshot.call_count == 0  # its not the whole listing
+    out, __ = capsys.readouterr()
+    assert SAMPLE_HOSTNAME in out
+
+
+def test_glob_to_regex():
+    """ Test glob_to_regex
+    """
+    assert test.glob_to_regex("api-*") == "^api-.*$"
+    assert test.glob_to_regex("a?.foo.com") == "^a.\\.foo\\.com$"
+
+
 @patch(PACKAGE + "is_verbose")
 @patch(PACKAGE + "gdomain_ls")
 @patch(PACKAGE + "gdomain_del")
@@ -83,10 +125,11 @@ def test_api_add(gdomain_add, gdomain_del, gdomain_ls, is_verbose, capsys):
     assert not out
 
 
+@patch(PACKAGE + "record_snapshot")
 @patch(PACKAGE + "is_verbose")
 @patch(PACKAGE + "gdomain_ls")
 @patch(PACKAGE + "gdomain_del")
-def test_api_del(gdomain_del, gdomain_ls, is_verbose, capsys):
+def test_api_del(gdomain_del, gdomain_ls, is_verbose, _, capsys):
     """ Test api_del
     """
 
@@ -114,3 +157,169 @@ def test_api_del(gdomain_del, gdomain_ls, is_verbose, capsys):
     assert gdomain_del.call_count == 0
     out, __ = capsys.readouterr()
     assert "Hostname not found" in out
+
+
+@patch(PACKAGE + "wait_for_success_notification")
+@patch(PACKAGE + "cdp_del")
+@patch(PACKAGE + "cdp_add")
+@patch(PACKAGE + "cdp_records_html")
+def test_gdomain_cdp(cdp_records_html, cdp_add, cdp_del, wait_for_success_notification):
+    """ Test that the gdomain_* functions dispatch to the CDP backend
+    """
+    browser = MagicMock(spec=CdpBrowser)
+    cdp_records_html.return_value = [f"{SAMPLE_HOSTNAME} → {SAMPLE_TARGET}"]
+    assert test.gdomain_ls(browser, SAMPLE_TLD) == {SAMPLE_HOSTNAME: SAMPLE_TARGET}
+
+    test.gdomain_add(browser, SAMPLE_TLD, "baz", SAMPLE_TARGET)
+    cdp_add.assert_called_once_with(browser, "baz", SAMPLE_TARGET)
+
+    test.gdomain_del(browser, SAMPLE_TLD, "baz")
+    cdp_del.assert_called_once_with(browser, SAMPLE_HOSTNAME)
+    assert wait_for_success_notification.call_count == 2
+
+
+@patch(PACKAGE + "time.sleep")
+@patch(PACKAGE + "does_element_exist")
+@patch(PACKAGE + "get_outcome")
+def test_wait_for_success_notification(get_outcome, does_element_exist, _):
+    """ Test wait_for_success_notification. Fails fast, on any failure signal
+    """
+    browser = MagicMock()
+
+    get_outcome.side_effect = [None, test.Outcome("success", "Changes saved")]
+    assert test.wait_for_success_notification(browser).ok
+
+    get_outcome.side_effect = [None, test.Outcome("error", "Invalid URL")]
+    with pytest.raises(test.MutationError) as e:
+        test.wait_for_success_notification(browser)
+    assert e.value.outcome.signal == "error"
+    assert get_outcome.call_count == 4
+
+    # the dialog stayed open, past the grace period
+    get_outcome.side_effect = None
+    get_outcome.return_value = None
+    does_element_exist.return_value = True
+    with patch(PACKAGE + "time.time") as time_time:
+        time_time.side_effect = [0, 1, 0, test.MODAL_GRACE_SECONDS + 1]
+        with pytest.raises(test.MutationError):
+            test.wait_for_success_notification(browser, test.DELETE_MODAL_TITLE)
+        assert does_element_exist.call_args[0][2] == test.DELETE_MODAL_TITLE
+
+        # nothing at all
+        time_time.side_effect = [0, test.OUTCOME_TIMEOUT_SECONDS + 1]
+        outcome = test.wait_for_outcome(browser)
+        assert outcome.signal == "timeout"
+
+
+def test_get_outcome_cdp():
+    """ Test get_outcome, with the CDP backend. One script, one round trip
+    """
+    browser = MagicMock(spec=CdpBrowser)
+    browser.execute_script.return_value = ["invalid", "Destination URL"]
+    assert test.get_outcome(browser) == test.Outcome("invalid", "Destination URL")
+    assert browser.execute_script.call_args[0][1] == test.ERROR_SIGNALS
+
+    browser.execute_script.return_value = None
+    assert test.get_outcome(browser) is None
+
+
+#
+# Below here, the DOM-walking functions run against the recorded fixture
+#
+def test_gdomain_ls_replay():
+    """ Test gdomain_ls against the fixture
+    """
+    browser = load_replay()
+    response = test.gdomain_ls(browser, SAMPLE_TLD)
+    assert response == {
+        SAMPLE_HOSTNAME: SAMPLE_TARGET,
+        f"api.{SAMPLE_TLD}": "https://api.example.com/v1",
+    }
+
+
+def test_gdomain_add_replay():
+    """ Test gdomain_add against the fixture
+    """
+    browser = load_replay()
+    test.gdomain_add(browser, SAMPLE_TLD, "foo", SAMPLE_TARGET)
+    assert [x[1] for x in browser.fills] == ["foo", SAMPLE_TARGET]
+    assert [x.text for x in browser.clicks] == [
+        "Temporary redirect (302)",
+        "Forward path",
+        "Enable SSL",
+        "Add",
+    ]
+
+
+def test_gdomain_del_replay():
+    """ Test gdomain_del against the fixture
+    """
+    browser = load_replay()
+    test.gdomain_del(browser, SAMPLE_TLD, "api")
+
+    # the row's delete button, then the modal's
+    row_delete, modal_delete = browser.clicks
+    row = row_delete._element.getparent().getparent()  # pylint: disable=protected-access
+    form = modal_delete._element.getparent()  # pylint: disable=protected-access
+    assert "api." in row.text_content()
+    assert form.tag == "form"
+
+
+def test_get_element_by_placeholder_replay():
+    """ Test get_element_by_placeholder against the fixture
+    """
+    records = test.get_synthetic_records_div(load_replay())
+    element = test.get_element_by_placeholder(records, "Destination URL")
+    assert 'placeholder="Destination URL"' in element.outer_html
+
+    with pytest.raises(RuntimeError):
+        test.get_element_by_placeholder(records, "Nope")
+
+
+def test_wait_for_tag_replay():
+    """ Test wait_for_tag and does_element_exist against the fixture
+    """
+    browser = load_replay()
+    test.wait_for_tag(browser, "h3", "Synthetic records")
+    assert test.does_element_exist(browser, "a", "Dismiss")
+    assert not test.does_element_exist(browser, "h3", "Nope")
+
+
+def test_notifications_replay():
+    """ Test count_notifications and dismiss_notifications against the fixture
+    """
+    browser = load_replay()
+    assert test.count_notifications(browser) == 1  # the other one is hidden
+    test.dismiss_notifications(browser)
+    assert [x.text for x in browser.clicks] == ["Dismiss"]
+
+
+def test_get_outcome_replay():
+    """ Test get_outcome against the fixture, and against failures edited into it
+    """
+    browser = load_replay()
+    assert test.get_outcome(browser) == test.Outcome("success", "Changes saved Dismiss")
+
+    # an error notification wins, even with its own Dismiss link
+    html = browser.html.replace(
+        "<span>Changes saved</span>", "<span>Error: the record already exists</span>", 1
+    )
+    html = html.replace('style="display: none"', "")
+    outcome = test.get_outcome(ReplayBrowser(html))
+    assert outcome.signal == "error"
+    assert "already exists" in outcome.message
+
+    html = browser.html.replace(
+        'placeholder="Destination URL"', 'placeholder="Destination URL" aria-invalid="true"'
+    )
+    assert test.get_outcome(ReplayBrowser(html)) == test.Outcome("invalid", "Destination URL")
+
+    html = browser.html.replace("<a>Dismiss</a>", "")
+    assert test.get_outcome(ReplayBrowser(html)) is None
+
+
+def load_replay():
+    """ Returns an in-process browser of the DNS page fixture
+    """
+    pytest.importorskip("lxml")
+    return load_fixture(FIXTURE)
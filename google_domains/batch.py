@@ -0,0 +1,46 @@
+"""
+    Batch mutations, from a file
+
+    One operation per line. Blank lines and # comments are skipped:
+        add foo https://google.com
+        del bar
+"""
+from typing import List
+from google_domains.client import GoogleDomainsClient, Operation
+
+
+def api_batch(client: GoogleDomainsClient, path: str, pipelined: bool = False) -> None:
+    """ Performs the file's operations in order, and prints how many changed anything
+    """
+    operations = read_batch_file(path)
+    results = client.apply(operations, pipelined=pipelined)
+
+    changed = sum(1 for x in results if x)
+    print()
+    print(f"Batch {path}: {changed} changed, {len(results) - changed} unchanged")
+
+
+def read_batch_file(path: str) -> List[Operation]:
+    """ Returns the file's operations
+    """
+    ret = []
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            ret.extend(parse_batch_line(line, f"{path}:{number}"))
+    return ret
+
+
+def parse_batch_line(line: str, location: str) -> List[Operation]:
+    """ Returns the line's operation, or nothing for a blank or comment line
+    """
+    fields = line.split("#", 1)[0].split()
+    if not fields:
+        return []
+
+    action = fields[0]
+    if action == "add" and len(fields) == 3:
+        return [Operation(action, fields[1], fields[2])]
+    if action == "del" and len(fields) == 2:
+        return [Operation(action, fields[1])]
+
+    raise ValueError(f"{location}: Expected 'add HOSTNAME TARGET' or 'del HOSTNAME'")
@@ -0,0 +1,41 @@
+"""
+    Tests for batch
+"""
+from mock import MagicMock  # create_autospec
+import pytest
+from google_domains import batch as test
+from google_domains.client import Operation
+
+
+def test_read_batch_file(tmp_path):
+    """ Tests read_batch_file
+    """
+    path = tmp_path / "changes.txt"
+    path.write_text(
+        "# redirects\nadd foo https://google.com\n\ndel bar  # gone\n", encoding="utf-8"
+    )
+    response = test.read_batch_file(str(path))
+    assert response == [
+        Operation("add", "foo", "https://google.com"),
+        Operation("del", "bar"),
+    ]
+
+    path.write_text("add foo\n", encoding="utf-8")
+    with pytest.raises(ValueError) as e:
+        test.read_batch_file(str(path))
+    assert "changes.txt:1" in str(e.value)
+
+
+def test_api_batch(tmp_path, capsys):
+    """ Tests api_batch
+    """
+    path = tmp_path / "changes.txt"
+    path.write_text("add foo https://google.com\ndel bar\n", encoding="utf-8")
+    client = MagicMock()
+    client.apply.return_value = [True, False]
+
+    test.api_batch(client, str(path), pipelined=True)
+    assert len(client.apply.call_args[0][0]) == 2
+    assert client.apply.call_args[1]["pipelined"] is True
+    out, __ = capsys.readouterr()
+    assert "1 changed, 1 unchanged" in out
@@ -0,0 +1,336 @@
+"""
+    Chrome DevTools Protocol backend
+
+    Drives Chromium directly over its DevTools websocket, instead of through
+    chromedriver's WebDriver HTTP hop. Lookups run as in-page scripts (see scripts.py),
+    so one round trip replaces many fine-grained element calls. Waits are promises
+    that a MutationObserver resolves, so they fire on DOM changes instead of polling
+
+    Needs a Chromium binary, and the websocket-client package
+"""
+import itertools
+import json
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+from urllib.request import urlopen
+from google_domains import scripts
+from google_domains.log import debug
+from google_domains.processes import reap_processes
+
+
+# Tried in order
+CHROMIUM_BINARIES = ["chromium", "chromium-browser", "google-chrome", "google-chrome-stable"]
+
+# How long to wait for Chromium to start listening
+STARTUP_TIMEOUT_SECONDS = 20.0
+
+# How long waits, and page loads, can take
+WAIT_TIMEOUT_SECONDS = 60.0
+
+# Part of the error when a page navigates while a script is running
+NAVIGATED_ERROR = "context was destroyed"
+
+# Wraps a script body the way WebDriver's execute_script does, so arguments[] works
+FUNCTION_TEMPLATE = "(function () {{ {script}\n}}).apply(null, {args})"
+
+# Resolves with the predicate's first truthy result, re-checking on every DOM mutation
+WAIT_TEMPLATE = """
+new Promise(function (resolve) {{
+    var predicate = function () {{ {script}
+    }};
+    var args = {args};
+    var observer = null, timer = null;
+    var done = function (result) {{
+        if (observer) {{ observer.disconnect(); }}
+        clearTimeout(timer);
+        resolve(result);
+    }};
+    var check = function () {{
+        var result = predicate.apply(null, args);
+        if (result) {{ done(result); }}
+    }};
+    observer = new MutationObserver(check);
+    observer.observe(document, {{
+        childList: true, subtree: true, attributes: true, characterData: true
+    }});
+    timer = setTimeout(function () {{ done(null); }}, {timeout_ms});
+    check();
+}})
+"""
+
+
+class CdpError(RuntimeError):
+    """ A DevTools command, or an in-page script, failed
+    """
+
+
+class CdpBrowser:
+    """ A headless Chromium, driven over the DevTools protocol
+        Mirrors the parts of splinter's Browser that dont involve element handles
+    """
+
+    def __init__(self, headless: bool = True, binary: Optional[str] = None) -> None:
+        # NOTE: websocket-client is only needed for this backend
+        import websocket  # pylint: disable=import-outside-toplevel
+
+        binary = binary or find_chromium()
+        port = get_free_port()
+        self.user_data_dir = tempfile.mkdtemp(prefix="google-domains-cdp-")
+
+        args = [
+            binary,
+            f"--remote-debugging-port={port}",
+            f"--user-data-dir={self.user_data_dir}",
+            "--no-sandbox",  # need this to run as root in a container
+            "--no-first-run",
+            "about:blank",
+        ]
+        if headless:
+            args.insert(1, "--headless")
+
+        self.process = subprocess.Popen(  # pylint: disable=consider-using-with
+            args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        self.events: List[Dict[str, Any]] = []
+        self._ids = itertools.count(1)
+        try:
+            self._socket = websocket.create_connection(
+                get_page_websocket_url(port), timeout=WAIT_TIMEOUT_SECONDS
+            )
+        except Exception:
+            reap_processes([self.process.pid])
+            raise
+        self.send("Page.enable")
+
+    def send(self, method: str, **params) -> Dict[str, Any]:
+        """ Sends one DevTools command, and returns its result
+            Events that arrive in the meantime are kept in self.events
+        """
+        message_id = next(self._ids)
+        self._socket.send(json.dumps({"id": message_id, "method": method, "params": params}))
+
+        while True:
+            message = json.loads(self._socket.recv())
+            if message.get("id") == message_id:
+                break
+            if "method" in message:
+                self.events.append(message)
+
+        if "error" in message:
+            raise CdpError(f"{method}: {message['error'].get('message')}")
+        return message.get("result", {})
+
+    def evaluate(self, expression: str, await_promise: bool = False) -> Any:
+        """ Evaluates the javascript expression in the page, and returns its value
+        """
+        result = self.send(
+            "Runtime.evaluate",
+            expression=expression,
+            returnByValue=True,
+            awaitPromise=await_promise,
+        )
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            text = details.get("exception", {}).get("description") or details.get("text")
+            raise CdpError(f"Script failed: {text}")
+        return result.get("result", {}).get("value")
+
+    def execute_script(self, script: str, *args) -> Any:
+        """ Runs the script body, with args as arguments[], like WebDriver does
+        """
+        return self.evaluate(FUNCTION_TEMPLATE.format(script=script, args=json.dumps(args)))
+
+    def evaluate_script(self, script: str, *args) -> Any:
+        """ Returns the value of the javascript expression, like splinter does
+        """
+        return self.execute_script(f"return {script};", *args)
+
+    def wait_for_script(
+        self, script: str, *args, timeout: float = WAIT_TIMEOUT_SECONDS
+    ) -> Any:
+        """ Waits until the script body returns something truthy, and returns it
+            The script re-runs on DOM mutations, not on a timer. Returns None on timeout
+        """
+        deadline = time.time() + timeout
+        while True:
+            remaining_ms = max(0, int((deadline - time.time()) * 1000))
+            expression = WAIT_TEMPLATE.format(
+                script=script, args=json.dumps(args), timeout_ms=remaining_ms
+            )
+            try:
+                return self.evaluate(expression, await_promise=True)
+            except CdpError as e:
+                # the page navigated mid-wait. Wait again, in the new page
+                if NAVIGATED_ERROR not in str(e) or time.time() > deadline:
+                    raise
+
+    def wait_for_event(self, method: str, timeout: float = WAIT_TIMEOUT_SECONDS) -> Dict:
+        """ Waits for the DevTools event, ie: "Page.loadEventFired", and returns it
+        """
+        deadline = time.time() + timeout
+        while True:
+            for i, event in enumerate(self.events):
+                if event["method"] == method:
+                    return self.events.pop(i)
+
+            if time.time() > deadline:
+                raise CdpError(f"Timed out waiting for {method}")
+
+            message = json.loads(self._socket.recv())
+            if "method" in message:
+                self.events.append(message)
+
+    def visit(self, url: str) -> None:
+        """ Navigates to the url, and waits for it to load
+        """
+        self.events.clear()
+        self.send("Page.navigate", url=url)
+        self.wait_for_event("Page.loadEventFired")
+
+    def reload(self) -> None:
+        """ Reloads the page, and waits for it to load
+        """
+        self.events.clear()
+        self.send("Page.reload")
+        self.wait_for_event("Page.loadEventFired")
+
+    def type_text(self, selector: str, text: str) -> None:
+        """ Focuses the element, and types the text into it like a user would
+        """
+        if not self.execute_script(scripts.FOCUS, selector):
+            raise CdpError(f"Element not found: {selector}")
+        self.send("Input.insertText", text=text)
+
+    @property
+    def url(self) -> str:
+        """ The current url
+        """
+        return self.evaluate("location.href")
+
+    @property
+    def html(self) -> str:
+        """ The whole document
+        """
+        return self.evaluate("document.documentElement.outerHTML")
+
+    def quit(self) -> None:
+        """ Closes the browser, and cleans up after it
+        """
+        try:
+            self.send("Browser.close")
+        except Exception:  # pylint: disable=broad-except
+            pass  # its already gone
+        finally:
+            self._socket.close()
+            reap_processes([self.process.pid])
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+def find_chromium() -> str:
+    """ Returns the path of the first Chromium binary on the PATH
+    """
+    for name in [os.environ.get("GOOGLE_DOMAINS_CHROMIUM", "")] + CHROMIUM_BINARIES:
+        path = shutil.which(name) if name else None
+        if path:
+            return path
+    raise RuntimeError(f"No Chromium found. Tried: {', '.join(CHROMIUM_BINARIES)}")
+
+
+def get_free_port() -> int:
+    """ Returns a local TCP port that nothing is listening on
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_page_websocket_url(port: int) -> str:
+    """ Waits for Chromium to start listening, and returns its page's websocket url
+    """
+    deadline = time.time() + STARTUP_TIMEOUT_SECONDS
+    while True:
+        try:
+            with urlopen(f"http://127.0.0.1:{port}/json/list", timeout=1) as response:
+                targets = json.loads(response.read().decode("utf-8"))
+            for target in targets:
+                if target.get("type") == "page":
+                    return target["webSocketDebuggerUrl"]
+        except OSError:
+            pass  # not listening yet
+
+        if time.time() > deadline:
+            raise CdpError(f"Chromium did not start listening on port {port}")
+        time.sleep(0.1)
+
+
+#
+# The gdomain_* operations, as in-page scripts. api.py dispatches to these
+#
+def cdp_login(browser: CdpBrowser, domain: str, username: str, password: str) -> None:
+    """ Logs in, and leaves the browser at the DNS page
+    """
+    browser.visit("https://domains.google.com/registrar/")
+    browser.events.clear()
+    click(browser, scripts.CLICK_CONTAINING, "a", "Sign")
+    browser.wait_for_event("Page.loadEventFired")
+    if not browser.wait_for_script(scripts.SELECTOR_VISIBLE, "#identifierId"):
+        raise CdpError("Timed out waiting for the sign-in page")
+
+    browser.type_text("#identifierId", username)
+    click(browser, scripts.CLICK_BY_TEXT, "button", "Next")
+    cdp_wait_for_tag(browser, "div", "Enter your password")
+
+    browser.type_text("input[name=password]", password)
+    click(browser, scripts.CLICK_BY_TEXT, "button", "Next")
+
+    browser.visit(f"https://domains.google.com/registrar/{domain}/dns")
+    cdp_wait_for_tag(browser, "h3", "Synthetic records")
+
+
+def cdp_records_html(
+    browser: CdpBrowser,
+    domain: str,
+    hostname_regex: Optional[str] = None,
+    target_regex: Optional[str] = None,
+) -> List[str]:
+    """ Returns the innerHTML of each synthetic record div, in one round trip
+        Optionally, only those whose hostname and target match the regexes
+    """
+    return browser.execute_script(
+        scripts.SYNTHETIC_RECORDS_HTML, domain, hostname_regex, target_regex
+    )
+
+
+def cdp_add(browser: CdpBrowser, hostname: str, target: str) -> None:
+    """ Fills in, and submits, the add form in one round trip
+    """
+    click(browser, scripts.ADD_SYNTHETIC_RECORD, hostname, target)
+
+
+def cdp_del(browser: CdpBrowser, hostname: str) -> None:
+    """ Clicks the record's Delete button, then the modal's
+    """
+    click(browser, scripts.CLICK_RECORD_DELETE, hostname)
+    cdp_wait_for_tag(browser, "h3", "Delete synthetic record?")
+    click(browser, scripts.CLICK_MODAL_BUTTON, "Delete synthetic record?", "Delete")
+
+
+def cdp_wait_for_tag(browser: CdpBrowser, tag: str, substring: str) -> None:
+    """ Waits for a visible element of the tag, containing the substring
+    """
+    debug(f"   wait: ({tag}) {substring}")
+    if not browser.wait_for_script(scripts.ELEMENT_VISIBLE, tag, substring):
+        raise CdpError(f"Timed out waiting for ({tag}) {substring}")
+    debug(f"  found: ({tag}) {substring}")
+
+
+def click(browser: CdpBrowser, script: str, *args) -> None:
+    """ Runs a script that clicks something, and returns false if it couldnt
+    """
+    if not browser.execute_script(script, *args):
+        raise CdpError(f"Element not found: {args}")
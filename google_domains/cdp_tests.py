@@ -0,0 +1,162 @@
+"""
+    Tests for cdp
+"""
+import json
+from typing import List
+from mock import MagicMock, patch  # create_autospec
+import pytest
+from google_domains import cdp as test
+from google_domains import scripts
+
+
+PACKAGE = "google_domains.cdp."
+
+
+class FakeSocket:
+    """ Replays DevTools responses, and records what was sent
+    """
+
+    def __init__(self, responses: List[dict]) -> None:
+        self.responses = [json.dumps(x) for x in responses]
+        self.sent: List[dict] = []
+
+    def send(self, data: str) -> None:
+        """ Records the sent message
+        """
+        self.sent.append(json.loads(data))
+
+    def recv(self) -> str:
+        """ Returns the next queued response
+        """
+        return self.responses.pop(0)
+
+    def close(self) -> None:
+        """ Nothing to close
+        """
+
+
+def make_browser(responses: List[dict]) -> test.CdpBrowser:
+    """ Returns a CdpBrowser over a FakeSocket, without launching Chromium
+    """
+    browser = test.CdpBrowser.__new__(test.CdpBrowser)
+    browser.events = []
+    browser._ids = test.itertools.count(1)  # pylint: disable=protected-access
+    browser._socket = FakeSocket(responses)  # type: ignore  # pylint: disable=protected-access
+    browser.process = MagicMock(pid=None)
+    browser.user_data_dir = "/nonexistent"
+    return browser
+
+
+def value(message_id: int, the_value) -> dict:
+    """ Returns a Runtime.evaluate response
+    """
+    return {"id": message_id, "result": {"result": {"value": the_value}}}
+
+
+def test_send():
+    """ Tests send, which matches responses by id and keeps events
+    """
+    event = {"method": "Page.loadEventFired", "params": {}}
+    browser = make_browser([event, {"id": 1, "result": {"frameId": "x"}}])
+
+    assert browser.send("Page.navigate", url="about:blank") == {"frameId": "x"}
+    assert browser.events == [event]
+    sent = browser._socket.sent[0]  # pylint: disable=protected-access
+    assert sent == {"id": 1, "method": "Page.navigate", "params": {"url": "about:blank"}}
+
+    # errors raise
+    browser = make_browser([{"id": 1, "error": {"message": "nope"}}])
+    with pytest.raises(test.CdpError) as e:
+        browser.send("Foo.bar")
+    assert "nope" in str(e.value)
+
+
+def test_execute_script():
+    """ Tests execute_script and evaluate_script
+    """
+    browser = make_browser([value(1, ["<b>a</b>"]), value(2, 3)])
+    assert browser.execute_script("return arguments[0];", "foo.com") == ["<b>a</b>"]
+    assert browser.evaluate_script("1 + 2") == 3
+
+    expressions = [x["params"]["expression"] for x in browser._socket.sent]  # pylint: disable=protected-access  # noqa
+    assert expressions[0].endswith('.apply(null, ["foo.com"])')
+    assert "return 1 + 2;" in expressions[1]
+
+    # script exceptions raise
+    failure = {"id": 1, "result": {"exceptionDetails": {"text": "Uncaught"}}}
+    browser = make_browser([failure])
+    with pytest.raises(test.CdpError):
+        browser.execute_script("throw 1;")
+
+
+def test_wait_for_script():
+    """ Tests wait_for_script, which re-waits when the page navigates
+    """
+    navigated = {
+        "id": 1,
+        "result": {"exceptionDetails": {"text": "Execution context was destroyed."}},
+    }
+    browser = make_browser([navigated, value(2, True)])
+    assert browser.wait_for_script(scripts.ELEMENT_VISIBLE, "a", "Dismiss") is True
+
+    sent = browser._socket.sent  # pylint: disable=protected-access
+    assert len(sent) == 2
+    assert sent[1]["params"]["awaitPromise"] is True
+    assert "MutationObserver" in sent[1]["params"]["expression"]
+
+    # timeouts resolve to null
+    browser = make_browser([value(1, None)])
+    assert browser.wait_for_script(scripts.ELEMENT_VISIBLE, "a", "Dismiss") is None
+
+
+def test_wait_for_event():
+    """ Tests wait_for_event
+    """
+    other = {"method": "Page.frameNavigated", "params": {}}
+    loaded = {"method": "Page.loadEventFired", "params": {"timestamp": 1}}
+    browser = make_browser([other, loaded])
+
+    assert browser.wait_for_event("Page.loadEventFired") == loaded
+    assert browser.events == [other]
+
+    with pytest.raises(test.CdpError):
+        browser.wait_for_event("Never.happens", timeout=-1)
+
+
+def test_cdp_operations():
+    """ Tests the cdp_* operations
+    """
+    browser = MagicMock()
+    browser.execute_script.return_value = True
+    browser.wait_for_script.return_value = True
+
+    test.cdp_add(browser, "foo", "https://foo.com")
+    assert browser.execute_script.call_args[0] == (
+        scripts.ADD_SYNTHETIC_RECORD,
+        "foo",
+        "https://foo.com",
+    )
+
+    test.cdp_del(browser, "foo.bar.com")
+    assert browser.execute_script.call_args[0][0] == scripts.CLICK_MODAL_BUTTON
+
+    # when the script cant find its element
+    browser.execute_script.return_value = False
+    with pytest.raises(test.CdpError):
+        test.cdp_del(browser, "foo.bar.com")
+
+    browser.wait_for_script.return_value = None
+    with pytest.raises(test.CdpError):
+        test.cdp_wait_for_tag(browser, "h3", "Synthetic records")
+
+
+@patch(PACKAGE + "shutil.which")
+def test_find_chromium(which):
+    """ Tests find_chromium
+    """
+    which.side_effect = lambda x: "/usr/bin/chromium" if x == "chromium" else None
+    assert test.find_chromium() == "/usr/bin/chromium"
+
+    which.side_effect = lambda x: None
+    with pytest.raises(RuntimeError):
+        test.find_chromium()
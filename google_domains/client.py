@@ -0,0 +1,212 @@
+"""
+    A reusable client, for embedding in long-running Python processes
+
+    Owns one logged-in session (via BrowserLifecycle, so it gets recycled as needed),
+    and caches the current listing. Returns values instead of printing.
+    Pass a RateGovernor to pace mutations. Share one between clients of the same account
+
+    Example:
+        with GoogleDomainsClient(domain, username, password) as client:
+            print(client.ls())
+            client.add("foo", "https://google.com")
+            client.delete("bar")
+            client.apply([Operation("add", "baz", "https://dweeb.com"), Operation("del", "foo")])
+"""
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from splinter import Browser
+from google_domains.api import gdomain_add, gdomain_del, gdomain_ls
+from google_domains.governor import RateGovernor
+from google_domains.inventory import record_snapshot
+from google_domains.lifecycle import BrowserLifecycle
+from google_domains.pipeline import Mutation, PipelinedExecutor
+from google_domains.utils import fqdn
+
+
+class Operation(NamedTuple):
+    """ One mutation, for apply(). action is "add" or "del". Deletes dont need a target
+    """
+
+    action: str
+    hostname: str
+    target: str = ""
+
+
+class GoogleDomainsClient:
+    """ CRUD operations on one domain's redirects, over one reusable session
+        max_operations and max_rss_mb are passed to the BrowserLifecycle
+    """
+
+    def __init__(
+        self,
+        domain: str,
+        username: str,
+        password: str,
+        browser_name: str = "firefox",
+        max_operations: int = 0,
+        max_rss_mb: int = 0,
+        governor: Optional[RateGovernor] = None,
+    ) -> None:  # pylint: disable=too-many-arguments
+        self.domain = domain
+        self.username = username
+        self.governor = governor
+        self.lifecycle = BrowserLifecycle(
+            domain, username, password, browser_name, max_operations, max_rss_mb
+        )
+        self._listing: Optional[Dict[str, str]] = None
+
+    def __enter__(self) -> "GoogleDomainsClient":
+        return self
+
+    def __exit__(self, the_type, the_value, the_traceback) -> None:
+        self.close()
+
+    def ls(self, refresh: bool = False) -> Dict[str, str]:
+        """ Returns a dict of hostnames to targets
+            Cached after the first call. Use refresh to pick up changes made elsewhere
+        """
+        listing = self._listing
+        if listing is None or refresh:
+            with self.operation() as browser:
+                listing = self._listing = gdomain_ls(browser, self.domain)
+            record_snapshot(self.domain, listing)
+        return dict(listing)
+
+    def add(self, hostname: str, target: str) -> bool:
+        """ Points the hostname to the target. Returns False if it already was
+        """
+        hostname = fqdn(hostname, self.domain)
+        entries = self.ls()
+        if entries.get(hostname) == target:
+            return False
+
+        with self.operation() as browser:
+            if hostname in entries:
+                self.mutate(gdomain_del, browser, self.domain, hostname)
+                self.forget(hostname)
+            self.mutate(gdomain_add, browser, self.domain, hostname, target)
+            self.remember(hostname, target)
+        return True
+
+    def delete(self, hostname: str) -> bool:
+        """ Deletes the hostname's redirect. Returns False if there wasnt one
+        """
+        hostname = fqdn(hostname, self.domain)
+        if hostname not in self.ls():
+            return False
+
+        with self.operation() as browser:
+            self.mutate(gdomain_del, browser, self.domain, hostname)
+            self.forget(hostname)
+        return True
+
+    def apply(self, operations: Iterable[Operation], pipelined: bool = False) -> List[bool]:
+        """ Performs the operations in order. Returns whether each one changed anything
+            Pipelined, each add's form is filled in while the previous save is in flight
+        """
+        if pipelined:
+            return self.apply_pipelined(list(operations))
+
+        ret = []
+        for operation in operations:
+            if operation.action == "add":
+                ret.append(self.add(operation.hostname, operation.target))
+            elif operation.action == "del":
+                ret.append(self.delete(operation.hostname))
+            else:
+                raise ValueError(f"Unsupported operation: {operation.action}")
+        return ret
+
+    def apply_pipelined(self, operations: List[Operation]) -> List[bool]:
+        """ Plans the operations against the listing, then runs the mutations pipelined
+        """
+        ret, mutations = self.plan(operations)
+        if not mutations:
+            return ret
+
+        def before_submit(mutation: Mutation) -> None:  # pylint: disable=unused-argument
+            if self.governor:
+                self.governor.acquire(self.username, self.domain)
+
+        def after_save(mutation: Mutation, ok: bool) -> None:
+            if self.governor:
+                self.governor.report(self.username, self.domain, ok=ok)
+            if ok and mutation.action == "add":
+                self.remember(mutation.hostname, mutation.target)
+            elif ok:
+                self.forget(mutation.hostname)
+
+        with self.operation() as browser:
+            executor = PipelinedExecutor(browser, self.domain, before_submit, after_save)
+            executor.run(mutations)
+        return ret
+
+    def plan(self, operations: List[Operation]) -> Tuple[List[bool], List[Mutation]]:
+        """ Returns whether each operation will change anything, and the mutations it takes
+        """
+        entries = self.ls()
+        changes = []
+        mutations = []
+        for operation in operations:
+            hostname = fqdn(operation.hostname, self.domain)
+            if operation.action == "add":
+                changes.append(entries.get(hostname) != operation.target)
+                if not changes[-1]:
+                    continue
+                if hostname in entries:
+                    mutations.append(Mutation("del", hostname))
+                mutations.append(Mutation("add", hostname, operation.target))
+                entries[hostname] = operation.target
+            elif operation.action == "del":
+                changes.append(hostname in entries)
+                if changes[-1]:
+                    mutations.append(Mutation("del", hostname))
+                    del entries[hostname]
+            else:
+                raise ValueError(f"Unsupported operation: {operation.action}")
+        return changes, mutations
+
+    @contextmanager
+    def operation(self) -> Iterator[Browser]:
+        """ Yields the browser for one operation. A failed one invalidates the listing,
+            since we cant know how far it got
+        """
+        try:
+            with self.lifecycle.operation() as browser:
+                yield browser
+        except Exception:
+            self._listing = None
+            raise
+
+    def mutate(self, function: Callable, *args) -> None:
+        """ Calls the gdomain_* mutation, paced by the governor if theres one
+        """
+        if not self.governor:
+            function(*args)
+            return
+
+        self.governor.acquire(self.username, self.domain)
+        try:
+            function(*args)
+        except Exception:
+            self.governor.report(self.username, self.domain, ok=False)
+            raise
+        self.governor.report(self.username, self.domain, ok=True)
+
+    def remember(self, hostname: str, target: str) -> None:
+        """ Updates the cached listing, after an add
+        """
+        if self._listing is not None:
+            self._listing[hostname] = target
+
+    def forget(self, hostname: str) -> None:
+        """ Updates the cached listing, after a delete
+        """
+        if self._listing is not None:
+            self._listing.pop(hostname, None)
+
+    def close(self) -> None:
+        """ Logs out, and reaps the browser
+        """
+        self._listing = None
+        self.lifecycle.close()
@@ -0,0 +1,175 @@
+"""
+    Tests for client
+"""
+from mock import MagicMock, patch  # create_autospec
+import pytest
+from selenium.common.exceptions import WebDriverException
+from google_domains import client as test
+
+
+PACKAGE = "google_domains.client."
+SAMPLE_TLD = "foobar.com"
+SAMPLE_HOSTNAME = f"baz.{SAMPLE_TLD}"
+SAMPLE_TARGET = "https://dweeb.com"
+
+
+@pytest.fixture(autouse=True)
+def record_snapshot():
+    """ Keeps the tests out of the real inventory
+    """
+    with patch(PACKAGE + "record_snapshot") as mock:
+        yield mock
+
+
+def make_client() -> test.GoogleDomainsClient:
+    """ Returns a client over a mock lifecycle
+    """
+    client = test.GoogleDomainsClient(SAMPLE_TLD, "u", "p")
+    client.lifecycle = MagicMock()
+    return client
+
+
+@patch(PACKAGE + "gdomain_ls")
+def test_ls(gdomain_ls):
+    """ Tests that ls caches the listing
+    """
+    gdomain_ls.return_value = {SAMPLE_HOSTNAME: SAMPLE_TARGET}
+    with make_client() as client:
+        assert client.ls() == {SAMPLE_HOSTNAME: SAMPLE_TARGET}
+        assert client.ls() == {SAMPLE_HOSTNAME: SAMPLE_TARGET}
+        assert gdomain_ls.call_count == 1
+
+        # callers cant mutate the cache
+        client.ls().clear()
+        assert client.ls()
+
+        client.ls(refresh=True)
+        assert gdomain_ls.call_count == 2
+
+    assert client.lifecycle.close.call_count == 1
+
+
+@patch(PACKAGE + "gdomain_del")
+@patch(PACKAGE + "gdomain_add")
+@patch(PACKAGE + "gdomain_ls")
+def test_add_and_delete(gdomain_ls, gdomain_add, gdomain_del):
+    """ Tests add and delete, which keep the cached listing current
+    """
+    gdomain_ls.return_value = {SAMPLE_HOSTNAME: SAMPLE_TARGET}
+    client = make_client()
+
+    # already there
+    assert client.add("baz", SAMPLE_TARGET) is False
+    assert gdomain_add.call_count == 0
+
+    # re-pointed
+    assert client.add("baz", "https://foo.com") is True
+    assert gdomain_del.call_count == 1
+    assert gdomain_add.call_args[0][1:] == (SAMPLE_TLD, SAMPLE_HOSTNAME, "https://foo.com")
+    assert client.ls() == {SAMPLE_HOSTNAME: "https://foo.com"}
+
+    assert client.delete("baz") is True
+    assert client.delete("baz") is False
+    assert gdomain_del.call_count == 2
+    assert not client.ls()
+    assert gdomain_ls.call_count == 1
+
+
+@patch(PACKAGE + "gdomain_del")
+@patch(PACKAGE + "gdomain_add")
+@patch(PACKAGE + "gdomain_ls")
+def test_apply(gdomain_ls, gdomain_add, gdomain_del):
+    """ Tests apply
+    """
+    gdomain_ls.return_value = {SAMPLE_HOSTNAME: SAMPLE_TARGET}
+    client = make_client()
+
+    response = client.apply(
+        [
+            test.Operation("add", "foo", SAMPLE_TARGET),
+            test.Operation("add", "baz", SAMPLE_TARGET),
+            test.Operation("del", "baz"),
+            test.Operation("del", "nope"),
+        ]
+    )
+    assert response == [True, False, True, False]
+    assert gdomain_add.call_count == 1
+    assert gdomain_del.call_count == 1
+
+    with pytest.raises(ValueError):
+        client.apply([test.Operation("mv", "foo")])
+
+
+@patch(PACKAGE + "gdomain_add")
+@patch(PACKAGE + "gdomain_ls")
+def test_failure_invalidates(gdomain_ls, gdomain_add):
+    """ Tests that a failed operation drops the cached listing
+    """
+    gdomain_ls.return_value = {}
+    gdomain_add.side_effect = WebDriverException("gone")
+    client = make_client()
+
+    with pytest.raises(WebDriverException):
+        client.add("foo", SAMPLE_TARGET)
+
+    client.ls()
+    assert gdomain_ls.call_count == 2
+
+
+@patch(PACKAGE + "gdomain_del")
+@patch(PACKAGE + "gdomain_add")
+@patch(PACKAGE + "gdomain_ls")
+def test_governor(gdomain_ls, gdomain_add, gdomain_del):
+    """ Tests that mutations are paced, and reported, by the governor
+    """
+    gdomain_ls.return_value = {SAMPLE_HOSTNAME: SAMPLE_TARGET}
+    gdomain_add.side_effect = [None, RuntimeError("throttled")]
+    client = make_client()
+    client.governor = MagicMock()
+
+    client.add("baz", "https://foo.com")  # a del, and an add
+    assert client.governor.acquire.call_count == 2
+    assert client.governor.acquire.call_args[0] == ("u", SAMPLE_TLD)
+    assert [x[1]["ok"] for x in client.governor.report.call_args_list] == [True, True]
+    assert gdomain_del.call_count == 1
+
+    with pytest.raises(RuntimeError):
+        client.add("foo", SAMPLE_TARGET)
+    assert client.governor.report.call_args[1]["ok"] is False
+
+
+@patch(PACKAGE + "PipelinedExecutor")
+@patch(PACKAGE + "gdomain_ls")
+def test_apply_pipelined(gdomain_ls, pipelined_executor):
+    """ Tests apply, pipelined. Plans the mutations, and keeps the cache current
+    """
+    gdomain_ls.return_value = {SAMPLE_HOSTNAME: SAMPLE_TARGET}
+    client = make_client()
+    client.governor = MagicMock()
+
+    operations = [
+        test.Operation("add", "baz", "https://foo.com"),
+        test.Operation("add", "foo", SAMPLE_TARGET),
+        test.Operation("add", "foo", SAMPLE_TARGET),
+        test.Operation("del", "nope"),
+    ]
+    assert client.apply(operations, pipelined=True) == [True, True, False, False]
+
+    mutations = pipelined_executor.return_value.run.call_args[0][0]
+    assert mutations == [
+        test.Mutation("del", SAMPLE_HOSTNAME),
+        test.Mutation("add", SAMPLE_HOSTNAME, "https://foo.com"),
+        test.Mutation("add", f"foo.{SAMPLE_TLD}", SAMPLE_TARGET),
+    ]
+
+    # the hooks pace with the governor, and update the cache
+    __, __, before_submit, after_save = pipelined_executor.call_args[0]
+    before_submit(mutations[0])
+    assert client.governor.acquire.call_count == 1
+    for mutation in mutations:
+        after_save(mutation, True)
+    assert client.ls() == {
+        SAMPLE_HOSTNAME: "https://foo.com",
+        f"foo.{SAMPLE_TLD}": SAMPLE_TARGET,
+    }
+    assert client.governor.report.call_count == 3
@@ -3,8 +3,22 @@
 
     Examples:
         > google-domains ls                             # lists the current redirects
+        > google-domains --match 'api-*' ls             # lists only the matching redirects
         > google-domains add foo https://google.com     # adds a redirect from foo to google.com
         > google-domains del foo                        # deletes the "foo" hostname redirect
+        > google-domains --record dns.html ls           # also saves the page as a test fixture
+        > google-domains rr-ls                          # lists the custom resource records
+        > google-domains -t A rr-add www --data 1.2.3.4 --data 5.6.7.8  # adds to a record set
+        > google-domains -t A rr-del www 1.2.3.4        # removes a value from a record set
+        > google-domains rr-sync records.yaml           # makes the records match the file
+        > google-domains --plan add foo https://google.com  # estimates how long it would take
+        > google-domains watch --interval 30            # streams redirect changes as NDJSON
+        > google-domains --log-file log.jsonl ls        # also logs everything, as JSON lines
+        > google-domains --rate 30 batch changes.txt    # runs the adds and dels in the file
+        > google-domains --pipeline batch changes.txt   # overlaps each save with the next fill
+        > google-domains --profile ls                   # ranks functions by driver round trips
+        > google-domains query 'api-*'                  # looks up listed redirects, offline
+        > google-domains --reverse query https://google.com  # which hostnames point here?
 
     YAML config file in ~/.google_domains.yaml can contain:
         verbose: False
@@ -18,8 +32,11 @@
         GOOGLE_DOMAINS_DOMAIN
         GOOGLE_DOMAINS_USERNAME
         GOOGLE_DOMAINS_PASSWORD
+        GOOGLE_DOMAINS_LOG_FILE
 
 """
+from box import Box
+from splinter import Browser
 from google_domains.config import configure
 from google_domains.api import (
     api_construct,
@@ -28,33 +45,109 @@ from google_domains.api import (
     api_del,
     api_ls,
 )
+from google_domains.batch import api_batch
+from google_domains.client import GoogleDomainsClient
+from google_domains.governor import DEFAULT_RATE_PER_MINUTE, RateGovernor
+from google_domains.inventory import api_query
+from google_domains.latency import print_plan, save_latencies
+from google_domains.lifecycle import BrowserLifecycle
+from google_domains.profiler import enable_profiling, print_profile
+from google_domains.records import (
+    api_rr_add,
+    api_rr_del,
+    api_rr_ls,
+    api_rr_sync,
+    parse_record,
+    ResourceRecord,
+)
+from google_domains.replay import record_fixture
+from google_domains.watch import api_watch, DEFAULT_INTERVAL_SECONDS
 
 
 def main():
     """ Reads the config, and performs the CRUDs
     """
+    browser = None
+    profile = False
     try:
         c = configure()
         if not c:
             return
 
+        profile = c.get("profile", False)
+        if profile:
+            enable_profiling()
+
+        if c.get("plan"):
+            print_plan(c.operation, c.domain)
+            return
+
+        if c.operation == "query":
+            api_query(c.hostname, c.get("reverse", False))
+            return
+
+        if c.operation == "watch":
+            with BrowserLifecycle(c.domain, c.username, c.password, c.browser) as lifecycle:
+                api_watch(lifecycle, c.domain, c.get("interval", DEFAULT_INTERVAL_SECONDS))
+            return
+
+        if c.operation == "batch":
+            rate = c.get("rate", DEFAULT_RATE_PER_MINUTE)
+            governor = RateGovernor(rate) if rate else None
+            with GoogleDomainsClient(
+                c.domain, c.username, c.password, c.browser, governor=governor
+            ) as client:
+                api_batch(client, c.hostname, c.get("pipeline", False))
+            return
+
         browser = api_construct(c.domain, c.username, c.password, c.browser)
 
-        if c.operation == "add":
-            api_add(browser, c.domain, c.hostname, c.target)
-            print()
-            print(f"Success! Pointed {c.hostname} to {c.target}")
-        elif c.operation == "del":
-            api_del(browser, c.domain, c.hostname)
-            print()
-            print(f"Success! Deleted {c.hostname}")
-        else:
-            api_ls(browser, c.domain)
+        if c.get("record"):
+            record_fixture(browser, c.record, [c.username, c.password])
+
+        run_operation(browser, c)
 
     except Exception as e:  # pylint: disable=broad-except
         print(e)
 
-    api_destruct(browser)
+    finally:
+        api_destruct(browser)
+        save_latencies()
+        if profile:
+            print_profile()
+
+
+def run_operation(browser: Browser, c: Box) -> None:
+    """ Performs the configured CRUD operation
+    """
+    if c.operation == "add":
+        api_add(browser, c.domain, c.hostname, c.target)
+        print()
+        print(f"Success! Pointed {c.hostname} to {c.target}")
+    elif c.operation == "del":
+        api_del(browser, c.domain, c.hostname)
+        print()
+        print(f"Success! Deleted {c.hostname}")
+    elif c.operation == "rr-ls":
+        api_rr_ls(browser, c.domain)
+    elif c.operation == "rr-add":
+        api_rr_add(browser, c.domain, get_record(c))
+        print()
+        print(f"Success! Updated {c.hostname} {c.record_type}")
+    elif c.operation == "rr-del":
+        api_rr_del(browser, c.domain, get_record(c))
+        print()
+        print(f"Success! Updated {c.hostname} {c.record_type}")
+    elif c.operation == "rr-sync":
+        api_rr_sync(browser, c.domain, c.hostname)
+    else:
+        api_ls(browser, c.domain, c.get("match"), c.get("target_match"))
+
+
+def get_record(c: Box) -> ResourceRecord:
+    """ Returns the custom resource record described by the config
+    """
+    return parse_record(c.hostname, c.record_type, c.get("ttl"), c.get("data", []))
 
 
 if __name__ == "__main__":
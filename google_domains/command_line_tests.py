@@ -16,6 +16,7 @@ def reset_mocks(*mocks):
         mock.reset_mock()
 
 
+@patch(PACKAGE + "save_latencies")
 @patch(PACKAGE + "configure")
 @patch(PACKAGE + "api_construct")
 @patch(PACKAGE + "api_destruct")
@@ -23,7 +24,7 @@ def reset_mocks(*mocks):
 @patch(PACKAGE + "api_add")
 @patch(PACKAGE + "api_del")
 def test_main(
-    api_del, api_add, api_ls, api_destruct, api_construct, configure, capsys
+    api_del, api_add, api_ls, api_destruct, api_construct, configure, _, capsys
 ):  # pylint: disable=too-many-arguments
     """ Tests main
     """
@@ -76,6 +77,17 @@ def test_main(
     assert not err
     reset_mocks(api_del, api_add, api_ls, api_destruct, api_construct, configure)
 
+    #
+    # login fails, so theres no browser to destruct. But destruct still reaps
+    #
+    api_construct.side_effect = Exception("no login")
+    test.main()
+    assert api_destruct.call_count == 1
+    assert api_destruct.call_args[0][0] is None
+    api_construct.side_effect = None
+    api_add.side_effect = None
+    reset_mocks(api_del, api_add, api_ls, api_destruct, api_construct, configure)
+
     #
     # del gets called
     #
@@ -103,3 +115,152 @@ def test_main(
     assert api_add.call_count == 0
     assert api_del.call_count == 0
     reset_mocks(api_del, api_add, api_ls, api_destruct, api_construct, configure)
+
+
+@patch(PACKAGE + "save_latencies")
+@patch(PACKAGE + "configure")
+@patch(PACKAGE + "api_construct")
+@patch(PACKAGE + "api_destruct")
+@patch(PACKAGE + "api_rr_ls")
+@patch(PACKAGE + "api_rr_add")
+@patch(PACKAGE + "api_rr_del")
+@patch(PACKAGE + "api_rr_sync")
+def test_main_records(
+    api_rr_sync, api_rr_del, api_rr_add, api_rr_ls, api_destruct, api_construct, configure, _
+):  # pylint: disable=too-many-arguments
+    """ Tests main, with the custom resource record operations
+    """
+    config = {
+        "domain": "foobar.com",
+        "username": "foo_username",
+        "password": "foo_password",
+        "browser": "firefox",
+        "hostname": "www",
+        "target": "",
+        "record_type": "A",
+        "data": ["1.2.3.4"],
+        "operation": "rr-add",
+    }
+    mocks = [api_rr_sync, api_rr_del, api_rr_add, api_rr_ls, api_destruct, api_construct]
+
+    for operation, mock in [
+        ("rr-ls", api_rr_ls),
+        ("rr-add", api_rr_add),
+        ("rr-del", api_rr_del),
+        ("rr-sync", api_rr_sync),
+    ]:
+        config["operation"] = operation
+        configure.return_value = Box(**config)
+        test.main()
+        assert mock.call_count == 1
+        assert sum(x.call_count for x in mocks[:4]) == 1
+        assert api_destruct.call_count == 1
+        reset_mocks(*mocks)
+
+    # the record gets built from the config
+    config["operation"] = "rr-add"
+    config["ttl"] = "5m"
+    configure.return_value = Box(**config)
+    test.main()
+    assert api_rr_add.call_args[0][2] == ("www", "A", 300, ["1.2.3.4"])
+
+
+@patch(PACKAGE + "save_latencies")
+@patch(PACKAGE + "configure")
+@patch(PACKAGE + "api_construct")
+@patch(PACKAGE + "print_plan")
+def test_main_plan(print_plan, api_construct, configure, _):
+    """ Tests main, with --plan. Never launches a browser
+    """
+    configure.return_value = Box(operation="add", domain="foobar.com", plan=True)
+    test.main()
+    assert print_plan.call_count == 1
+    assert print_plan.call_args[0] == ("add", "foobar.com")
+    assert api_construct.call_count == 0
+
+
+@patch(PACKAGE + "save_latencies")
+@patch(PACKAGE + "configure")
+@patch(PACKAGE + "api_construct")
+@patch(PACKAGE + "BrowserLifecycle")
+@patch(PACKAGE + "api_watch")
+def test_main_watch(api_watch, browser_lifecycle, api_construct, configure, _):
+    """ Tests main, with watch. The lifecycle owns the session
+    """
+    configure.return_value = Box(
+        operation="watch",
+        domain="foobar.com",
+        username="u",
+        password="p",
+        browser="firefox",
+        interval=30.0,
+    )
+    test.main()
+    assert browser_lifecycle.call_args[0] == ("foobar.com", "u", "p", "firefox")
+    assert api_watch.call_args[0][1:] == ("foobar.com", 30.0)
+    assert api_construct.call_count == 0
+
+
+@patch(PACKAGE + "save_latencies")
+@patch(PACKAGE + "configure")
+@patch(PACKAGE + "GoogleDomainsClient")
+@patch(PACKAGE + "api_batch")
+def test_main_batch(api_batch, client, configure, _):
+    """ Tests main, with batch
+    """
+    config = dict(
+        operation="batch",
+        domain="foobar.com",
+        username="u",
+        password="p",
+        browser="firefox",
+        hostname="changes.txt",
+    )
+    configure.return_value = Box(config, pipeline=True)
+    test.main()
+    assert api_batch.call_args[0][1:] == ("changes.txt", True)
+    assert client.call_args[1]["governor"]
+
+    # no limit
+    configure.return_value = Box(config, rate=0)
+    test.main()
+    assert client.call_args[1]["governor"] is None
+
+
+@patch(PACKAGE + "save_latencies")
+@patch(PACKAGE + "configure")
+@patch(PACKAGE + "api_construct")
+@patch(PACKAGE + "api_destruct")
+@patch(PACKAGE + "api_ls")
+@patch(PACKAGE + "enable_profiling")
+@patch(PACKAGE + "print_profile")
+def test_main_profile(
+    print_profile, enable_profiling, api_ls, _, __, configure, ___
+):  # pylint: disable=too-many-arguments
+    """ Tests main, with --profile
+    """
+    configure.return_value = Box(
+        operation="ls",
+        domain="foobar.com",
+        username="u",
+        password="p",
+        browser="firefox",
+        profile=True,
+    )
+    test.main()
+    assert enable_profiling.call_count == 1
+    assert api_ls.call_count == 1
+    assert print_profile.call_count == 1
+
+
+@patch(PACKAGE + "save_latencies")
+@patch(PACKAGE + "configure")
+@patch(PACKAGE + "api_construct")
+@patch(PACKAGE + "api_query")
+def test_main_query(api_query, api_construct, configure, _):
+    """ Tests main, with query. Never launches a browser
+    """
+    configure.return_value = Box(operation="query", hostname="api-*", reverse=True)
+    test.main()
+    assert api_query.call_args[0] == ("api-*", True)
+    assert api_construct.call_count == 0
@@ -3,11 +3,12 @@
 """
 import argparse
 import os.path
+import re
 import sys
 from typing import Dict, List, Optional
 from box import Box
 import yaml
-from google_domains.log import set_verbose
+from google_domains.log import set_log_file, set_verbose
 
 
 # Type alias
@@ -37,6 +38,11 @@ def configure() -> Optional[Box]:
             "operation",
             "hostname",
             "target",
+            "record_type",
+            "ttl",
+            "data",
+            "interval",
+            "rate",
         ]
         for key in keys:
             print(f"   config {key}: {config.get(key, '')}")
@@ -44,6 +50,8 @@ def configure() -> Optional[Box]:
 
     ret = Box(config)
     set_verbose(ret.verbose)
+    if ret.get("log_file"):
+        set_log_file(ret.log_file)
 
     error_message = validate_args(ret)
     if error_message:
@@ -84,7 +92,7 @@ def initialize_from_env() -> ConfigDict:
     """
     ret: ConfigDict = {}
 
-    keys = ["verbose", "browser", "username", "password", "domain"]
+    keys = ["verbose", "browser", "username", "password", "domain", "log_file"]
     for key in keys:
         set_if_present(ret, key)
 
@@ -122,7 +130,8 @@ def initialize_from_cmdline(the_args: List[str]) -> ConfigDict:
         help="The browser to use. Requires it to be installed",
         default="firefox",
         # https://splinter.readthedocs.io/en/latest/browser.html
-        choices=["chrome", "firefox", "zope.testbrowser"],
+        # cdp drives Chromium directly over the DevTools protocol. Skips the WebDriver hop
+        choices=["cdp", "chrome", "firefox", "zope.testbrowser"],
     )
     parser.add_argument(
         "-q", "--quiet", dest="quiet", help="Decrease verbosity", action="store_true"
@@ -134,25 +143,122 @@ def initialize_from_cmdline(the_args: List[str]) -> ConfigDict:
         "-p", "--password", dest="password", help="Your Google Domains password"
     )
     parser.add_argument("-d", "--domain", dest="domain", help="The domain suffix")
+    parser.add_argument(
+        "--record",
+        dest="record",
+        help="Save the DNS page, scrubbed of secrets, to this file. For offline tests",
+    )
+    parser.add_argument(
+        "--plan",
+        "--dry-run",
+        dest="plan",
+        help="Print the estimated time of the operation, from past runs. Changes nothing",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        help="Count and time every driver round trip, and print which functions made them",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-t",
+        "--type",
+        dest="record_type",
+        type=str.upper,
+        help="The custom resource record type, for the rr-* operations",
+        default="A",
+        choices=["A", "AAAA", "CNAME", "MX", "TXT"],
+    )
+    parser.add_argument(
+        "--ttl", dest="ttl", help="The custom resource record TTL, ie: 3600 or 1h"
+    )
+    parser.add_argument(
+        "--data",
+        dest="data",
+        help="A custom resource record data value. Repeat for multiple values",
+        action="append",
+    )
+
+    parser.add_argument(
+        "--log-file",
+        dest="log_file",
+        help="Also append every log message to this file, as JSON lines",
+    )
+    parser.add_argument(
+        "--match",
+        dest="match",
+        help="For ls, only the hostnames that match this glob, ie: 'api-*'",
+    )
+    parser.add_argument(
+        "--target-match",
+        dest="target_match",
+        help="For ls, only the redirects whose target matches this regex",
+    )
+    parser.add_argument(
+        "--reverse",
+        dest="reverse",
+        help="For query, look up the hostnames that point to a target",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--interval",
+        dest="interval",
+        type=float,
+        help="How often the watch operation polls for changes, in seconds",
+    )
+
+    parser.add_argument(
+        "--rate",
+        dest="rate",
+        type=float,
+        help="The most mutations per minute, per account and per domain, for batch. "
+        "Backs off automatically on errors. 0 for no limit",
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        dest="pipeline",
+        help="For batch, fill in each add while the previous save is in flight",
+        action="store_true",
+    )
 
     # Positional args
     parser.add_argument(
         dest="operation",
         type=str,
-        help="The CRUD operation. List redirects, add a redirect, or delete a redirect",
+        help="The CRUD operation. List redirects, add a redirect, or delete a redirect. "
+        "The rr-* operations do the same for custom resource records. "
+        "Watch streams changes to the redirects. Batch runs the adds and dels in a file. "
+        "Query looks up redirects on every listed domain, from the local inventory",
         default="ls",
         nargs="?",
-        choices=["ls", "add", "del"],
+        choices=[
+            "ls",
+            "add",
+            "del",
+            "rr-ls",
+            "rr-add",
+            "rr-del",
+            "rr-sync",
+            "watch",
+            "batch",
+            "query",
+        ],
     )
     parser.add_argument(
         dest="hostname",
         type=str,
-        help="The hostname to add or delete",
+        help="The hostname to add or delete. For rr-sync and batch, the file of changes. "
+        "For query, a hostname glob like 'api-*', or a target with --reverse",
         default="",
         nargs="?",
     )
     parser.add_argument(
-        dest="target", help="The target URL to add", default="", nargs="?"
+        dest="target",
+        help="The target URL to add. For rr-add and rr-del, a data value",
+        default="",
+        nargs="?",
     )
     args, _ = parser.parse_known_args(the_args)
 
@@ -170,11 +276,38 @@ def initialize_from_cmdline(the_args: List[str]) -> ConfigDict:
         ret["password"] = args.password
     if args.domain:
         ret["domain"] = args.domain
+    if args.record:
+        ret["record"] = args.record
+    if args.ttl:
+        ret["ttl"] = args.ttl
+    if args.plan:
+        ret["plan"] = args.plan
+    if args.profile:
+        ret["profile"] = args.profile
+    if args.reverse:
+        ret["reverse"] = args.reverse
+    if args.match:
+        ret["match"] = args.match
+    if args.target_match:
+        ret["target_match"] = args.target_match
+    if args.interval:
+        ret["interval"] = args.interval
+    if args.log_file:
+        ret["log_file"] = args.log_file
+    if args.rate is not None:
+        ret["rate"] = args.rate
+    if args.pipeline:
+        ret["pipeline"] = args.pipeline
+
+    data = args.data or ([args.target] if args.target else [])
+    if data:
+        ret["data"] = data
 
     # Always set these
     ret["hostname"] = args.hostname
     ret["target"] = args.target
     ret["operation"] = args.operation
+    ret["record_type"] = args.record_type
 
     return ret
 
@@ -188,6 +321,11 @@ def validate_args(args: Box) -> Optional[str]:
     operation_dependencies = {
         "add": ["hostname", "target"],
         "del": ["hostname"],
+        "rr-add": ["hostname", "data"],
+        "rr-del": ["hostname"],
+        "rr-sync": ["hostname"],
+        "batch": ["hostname"],
+        "query": ["hostname"],
     }
 
     for operation, dependencies in operation_dependencies.items():
@@ -196,8 +334,19 @@ def validate_args(args: Box) -> Optional[str]:
                 if key not in args:
                     return f"The {args.operation} operation needs a --{key}"
 
-    # All of these arguments are required for everything
-    for key in ["username", "password", "domain"]:
+    if "target_match" in args:
+        try:
+            re.compile(args.target_match)
+        except re.error as e:
+            return f"Invalid --target-match regex: {e}"
+
+    # All of these arguments are required for everything. Plans and queries dont log in
+    required = ["username", "password", "domain"]
+    if args.get("plan"):
+        required = ["domain"]
+    if args.operation == "query":
+        required = []
+    for key in required:
         if key not in args:
             return f"Needs a {key}. Please either use the -{key[0]} option, set GOOGLE_DOMAINS_{key.upper()}, or set it in the config file(s)"  # noqa  # pylint: disable=line-too-long
 
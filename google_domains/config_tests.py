@@ -86,6 +86,56 @@ def test_initialize_from_cmdline():
     assert response.get("browser") == "firefox"
     assert response.get("operation") == "ls"
 
+    # RECORD A FIXTURE
+    response = test.initialize_from_cmdline("--record dns.html ls".split())
+    assert response.get("record") == "dns.html"
+    assert response.get("operation") == "ls"
+
+    # CUSTOM RESOURCE RECORDS
+    response = test.initialize_from_cmdline("-t txt rr-add www foo".split())
+    assert response.get("record_type") == "TXT"
+    assert response.get("data") == ["foo"]
+    response = test.initialize_from_cmdline(
+        "--ttl 1h rr-add www --data a --data b".split()
+    )
+    assert response.get("record_type") == "A"
+    assert response.get("ttl") == "1h"
+    assert response.get("data") == ["a", "b"]
+
+    # PROFILE
+    response = test.initialize_from_cmdline("--profile ls".split())
+    assert response.get("profile") is True
+
+    # PLAN
+    response = test.initialize_from_cmdline("--dry-run add foo bar".split())
+    assert response.get("plan") is True
+    assert response.get("operation") == "add"
+
+    # WATCH
+    response = test.initialize_from_cmdline("--interval 30 watch".split())
+    assert response.get("interval") == 30.0
+    assert response.get("operation") == "watch"
+
+    # LOG FILE
+    response = test.initialize_from_cmdline("--log-file log.jsonl ls".split())
+    assert response.get("log_file") == "log.jsonl"
+
+    # BATCH
+    response = test.initialize_from_cmdline("--rate 0 --pipeline batch changes.txt".split())
+    assert response.get("rate") == 0
+    assert response.get("pipeline") is True
+    assert response.get("hostname") == "changes.txt"
+
+    # FILTERED LS
+    response = test.initialize_from_cmdline(["--match", "api-*", "--target-match", "^https:", "ls"])
+    assert response.get("match") == "api-*"
+    assert response.get("target_match") == "^https:"
+
+    # QUERY
+    response = test.initialize_from_cmdline("--reverse query https://foo.com".split())
+    assert response.get("reverse") is True
+    assert response.get("hostname") == "https://foo.com"
+
     # INVALID BROWSER
     with pytest.raises(SystemExit) as e:
         response = test.initialize_from_cmdline("--browser foobar".split())
@@ -108,6 +158,12 @@ def test_validate_args():
         [{"operation": "add", "hostname": "foobar"}, ["target"]],
         # No hostname for del
         [{"operation": "del"}, ["hostname"]],
+        # No data for rr-add
+        [{"operation": "rr-add", "hostname": "www"}, ["data"]],
+        # No file for rr-sync
+        [{"operation": "rr-sync"}, ["hostname"]],
+        # No file for batch
+        [{"operation": "batch"}, ["hostname"]],
         # No username
         [{"operation": "ls"}, ["username", "Please"]],
         # Has username, but no password
@@ -116,6 +172,18 @@ def test_validate_args():
         [{"operation": "ls", "username": "foo", "password": "bar"}, ["domain"]],
     ]
 
+    # Bad regexes
+    args = {"operation": "ls", "target_match": "(", "username": "u", "password": "p"}
+    assert "--target-match" in test.validate_args(Box(args))
+
+    # Queries dont need credentials, or a domain
+    assert test.validate_args(Box({"operation": "query", "hostname": "api-*"})) is None
+    assert "hostname" in test.validate_args(Box({"operation": "query"}))
+
+    # Plans dont need credentials
+    assert test.validate_args(Box({"operation": "ls", "plan": True, "domain": "x"})) is None
+    assert "domain" in test.validate_args(Box({"operation": "ls", "plan": True}))
+
     for validation_test in validation_tests:
         args = validation_test[0]
         strings = validation_test[1]
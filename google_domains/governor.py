@@ -0,0 +1,132 @@
+"""
+    Rate governor for bulk mutations
+
+    Pushing many mutations back to back gets throttled by the registrar UI.
+    RateGovernor keeps a token bucket per account and per domain, and a mutation
+    has to take a token from both. Buckets adapt: every failure halves the rate,
+    and every success recovers a little of it, up to the configured rate
+
+    Example:
+        governor = RateGovernor(per_minute=20)
+        governor.acquire(username, domain)  # blocks until theres a token
+        ...
+        governor.report(username, domain, ok=True)
+"""
+import threading
+import time
+from typing import Dict, List, Tuple
+from google_domains.log import debug
+
+
+# Mutations per minute, per account and per domain
+DEFAULT_RATE_PER_MINUTE = 20.0
+
+# How many mutations can go back to back, after a quiet period
+DEFAULT_BURST = 3.0
+
+# A failure multiplies the rate by this
+BACKOFF_FACTOR = 0.5
+
+# A success adds this fraction of the configured rate back
+RECOVERY_RATIO = 0.1
+
+# The rate never drops below this fraction of the configured rate
+MIN_RATE_RATIO = 0.05
+
+
+class TokenBucket:
+    """ Holds up to burst tokens, refilled at rate tokens per second
+    """
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def refill(self) -> None:
+        """ Adds the tokens earned since the last refill
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """ Returns how many seconds until theres a whole token
+        """
+        self.refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        """ Uses up a token
+        """
+        self.tokens -= 1
+
+    def slow_down(self) -> None:
+        """ Backs the rate off, multiplicatively
+        """
+        self.refill()
+        self.rate = max(self.max_rate * MIN_RATE_RATIO, self.rate * BACKOFF_FACTOR)
+
+    def speed_up(self) -> None:
+        """ Recovers some of the rate, additively
+        """
+        self.refill()
+        self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_RATIO)
+
+
+class RateGovernor:
+    """ Token buckets per account and per domain. Thread-safe
+    """
+
+    def __init__(
+        self, per_minute: float = DEFAULT_RATE_PER_MINUTE, burst: float = DEFAULT_BURST
+    ) -> None:
+        if per_minute <= 0:
+            raise ValueError(f"The rate must be positive: {per_minute}")
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def get_buckets(self, account: str, domain: str) -> List[TokenBucket]:
+        """ Returns the account's bucket and the domain's, creating them as needed
+        """
+        ret = []
+        for key in [("account", account), ("domain", domain)]:
+            if key not in self.buckets:
+                self.buckets[key] = TokenBucket(self.rate, self.burst)
+            ret.append(self.buckets[key])
+        return ret
+
+    def acquire(self, account: str, domain: str) -> float:
+        """ Blocks until both buckets have a token, and takes them
+            Returns how many seconds it waited
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                buckets = self.get_buckets(account, domain)
+                wait = max(x.wait_time() for x in buckets)
+                if wait <= 0:
+                    for bucket in buckets:
+                        bucket.take()
+                    return waited
+
+            debug(f"   rate: waiting {wait:.1f}s for {domain}")
+            time.sleep(wait)
+            waited += wait
+
+    def report(self, account: str, domain: str, ok: bool) -> None:
+        """ Adapts the rates to how the last mutation went
+        """
+        with self.lock:
+            for bucket in self.get_buckets(account, domain):
+                if ok:
+                    bucket.speed_up()
+                else:
+                    bucket.slow_down()
+                    debug(f"   rate: slowed to {bucket.rate * 60:.1f}/min")
@@ -0,0 +1,81 @@
+"""
+    Tests for governor
+"""
+from mock import patch  # create_autospec
+import pytest
+from google_domains import governor as test
+
+
+PACKAGE = "google_domains.governor."
+
+
+class FakeClock:
+    """ A monotonic clock that only moves when something sleeps
+    """
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        """ Returns the current time
+        """
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """ Moves time forward
+        """
+        self.now += seconds
+
+
+@patch(PACKAGE + "time")
+def test_token_bucket(time):
+    """ Tests TokenBucket, at one token per second
+    """
+    clock = FakeClock()
+    time.monotonic = clock.monotonic
+
+    bucket = test.TokenBucket(rate=1.0, burst=2.0)
+    assert bucket.wait_time() == 0
+    bucket.take()
+    bucket.take()
+    assert bucket.wait_time() == pytest.approx(1.0)
+
+    clock.sleep(10)  # never more than the burst
+    assert bucket.wait_time() == 0
+    assert bucket.tokens == 2.0
+
+    # failures halve the rate, down to a floor. Successes recover it, up to the max
+    bucket.slow_down()
+    assert bucket.rate == 0.5
+    for _ in range(10):
+        bucket.slow_down()
+    assert bucket.rate == pytest.approx(test.MIN_RATE_RATIO)
+    for _ in range(20):
+        bucket.speed_up()
+    assert bucket.rate == 1.0
+
+
+@patch(PACKAGE + "time")
+def test_rate_governor(time):
+    """ Tests RateGovernor. Accounts and domains have separate buckets
+    """
+    clock = FakeClock()
+    time.monotonic = clock.monotonic
+    time.sleep = clock.sleep
+
+    governor = test.RateGovernor(per_minute=60, burst=1)
+    assert governor.acquire("me", "foo.com") == 0
+    assert governor.acquire("me", "foo.com") == pytest.approx(1.0)
+
+    # the account's bucket is shared across domains
+    assert governor.acquire("me", "bar.com") == pytest.approx(1.0)
+    assert governor.acquire("you", "baz.com") == 0
+
+    # failures slow down both buckets
+    governor.report("me", "foo.com", ok=False)
+    assert governor.acquire("me", "foo.com") == pytest.approx(2.0)
+    governor.report("me", "foo.com", ok=True)
+    assert governor.buckets[("domain", "foo.com")].rate == pytest.approx(0.6)
+
+    with pytest.raises(ValueError):
+        test.RateGovernor(per_minute=0)
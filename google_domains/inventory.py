@@ -0,0 +1,131 @@
+"""
+    Cross-domain record inventory
+
+    A local SQLite index of the synthetic records, across every domain we've listed.
+    Each listing is saved as a timestamped snapshot. Queries answer from each domain's
+    latest snapshot in milliseconds, without launching a browser:
+        - forward: which target does this hostname (or glob of hostnames) point to?
+        - reverse: which hostnames, on any domain, point to this target?
+"""
+from contextlib import closing
+import os.path
+import sqlite3
+import time
+from typing import Dict, List, NamedTuple, Optional
+from tabulate import tabulate
+from google_domains.log import debug
+from google_domains.utils import get_state_path
+
+
+INVENTORY_FILENAME = "inventory.sqlite"
+
+# Older snapshots than this, per domain, are pruned
+MAX_SNAPSHOTS_PER_DOMAIN = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    domain TEXT NOT NULL,
+    taken_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+    hostname TEXT NOT NULL,
+    target TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_domain ON snapshots(domain, taken_at);
+CREATE INDEX IF NOT EXISTS records_hostname ON records(hostname);
+CREATE INDEX IF NOT EXISTS records_target ON records(target);
+CREATE INDEX IF NOT EXISTS records_snapshot ON records(snapshot_id);
+"""
+
+# The latest snapshot of each domain
+LATEST = """
+SELECT s.domain, r.hostname, r.target, s.taken_at
+FROM records r JOIN snapshots s ON s.id = r.snapshot_id
+WHERE s.id IN (SELECT MAX(id) FROM snapshots GROUP BY domain)
+"""
+
+
+class InventoryRecord(NamedTuple):
+    """ One record, from a domain's latest snapshot
+    """
+
+    domain: str
+    hostname: str
+    target: str
+    taken_at: float
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    """ Opens the inventory, creating it if needed
+    """
+    connection = sqlite3.connect(path or get_state_path(INVENTORY_FILENAME))
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def record_snapshot(
+    domain: str, entries: Dict[str, str], path: Optional[str] = None
+) -> None:
+    """ Saves a listing of the domain, as its latest snapshot
+        Failures are only logged. The inventory is a cache, not the source of truth
+    """
+    try:
+        with closing(connect(path)) as connection, connection:
+            cursor = connection.execute(
+                "INSERT INTO snapshots (domain, taken_at) VALUES (?, ?)", (domain, time.time())
+            )
+            connection.executemany(
+                "INSERT INTO records (snapshot_id, hostname, target) VALUES (?, ?, ?)",
+                [(cursor.lastrowid, key, val) for key, val in entries.items()],
+            )
+            connection.execute(
+                "DELETE FROM snapshots WHERE domain = ? AND id NOT IN "
+                "(SELECT id FROM snapshots WHERE domain = ? ORDER BY id DESC LIMIT ?)",
+                (domain, domain, MAX_SNAPSHOTS_PER_DOMAIN),
+            )
+    except sqlite3.Error as e:
+        debug(f"inventory: {e}")
+
+
+def query_forward(pattern: str, path: Optional[str] = None) -> List[InventoryRecord]:
+    """ Returns the records whose hostname matches the glob pattern, ie: "api-*"
+        A pattern without wildcards is an exact lookup. A trailing * is a prefix lookup
+    """
+    return query(f"{LATEST} AND r.hostname GLOB ?", pattern, path)
+
+
+def query_reverse(target: str, path: Optional[str] = None) -> List[InventoryRecord]:
+    """ Returns the records, on any domain, that point to the target
+    """
+    return query(f"{LATEST} AND r.target = ?", target, path)
+
+
+def query(sql: str, value: str, path: Optional[str]) -> List[InventoryRecord]:
+    """ Runs the query against the inventory, if theres one yet
+    """
+    path = path or get_state_path(INVENTORY_FILENAME)
+    if not os.path.isfile(path):
+        return []
+
+    with closing(connect(path)) as connection:
+        rows = connection.execute(f"{sql} ORDER BY s.domain, r.hostname", (value,))
+        return [InventoryRecord(*row) for row in rows]
+
+
+def api_query(term: str, reverse: bool = False) -> None:
+    """ Prints the matching records, and how old each snapshot is
+    """
+    records = query_reverse(term) if reverse else query_forward(term)
+
+    array = []
+    for record in records:
+        taken_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(record.taken_at))
+        array.append([record.domain, record.hostname, record.target, taken_at])
+    headers = ["Domain", "Hostname", "Redirect URL", "As of"]
+
+    print()
+    print(tabulate(array, headers, tablefmt="simple"))
+    print()
@@ -0,0 +1,69 @@
+"""
+    Tests for inventory
+"""
+from mock import patch  # create_autospec
+from google_domains import inventory as test
+
+
+PACKAGE = "google_domains.inventory."
+SAMPLE_TARGET = "https://dweeb.com"
+
+
+def test_queries(tmp_path):
+    """ Tests record_snapshot, query_forward and query_reverse
+    """
+    path = str(tmp_path / "inventory.sqlite")
+    assert not test.query_forward("*", path)  # no inventory yet
+
+    test.record_snapshot("foo.com", {"api.foo.com": SAMPLE_TARGET, "www.foo.com": "x"}, path)
+    test.record_snapshot("bar.com", {"api-1.bar.com": SAMPLE_TARGET}, path)
+
+    # forward: exact, and glob
+    response = test.query_forward("www.foo.com", path)
+    assert [(x.domain, x.target) for x in response] == [("foo.com", "x")]
+    response = test.query_forward("api*", path)
+    assert [x.hostname for x in response] == ["api-1.bar.com", "api.foo.com"]
+
+    # reverse, across domains
+    response = test.query_reverse(SAMPLE_TARGET, path)
+    assert [x.domain for x in response] == ["bar.com", "foo.com"]
+
+    # only the latest snapshot counts
+    test.record_snapshot("foo.com", {"www.foo.com": "x"}, path)
+    response = test.query_reverse(SAMPLE_TARGET, path)
+    assert [x.domain for x in response] == ["bar.com"]
+
+
+def test_pruning(tmp_path):
+    """ Tests that old snapshots get pruned
+    """
+    path = str(tmp_path / "inventory.sqlite")
+    for i in range(test.MAX_SNAPSHOTS_PER_DOMAIN + 5):
+        test.record_snapshot("foo.com", {"www.foo.com": str(i)}, path)
+
+    connection = test.connect(path)
+    snapshots = connection.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+    records = connection.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+    connection.close()
+    assert snapshots == records == test.MAX_SNAPSHOTS_PER_DOMAIN
+
+
+def test_record_snapshot_failure(tmp_path):
+    """ Tests that a broken inventory doesnt break listing
+    """
+    test.record_snapshot("foo.com", {}, str(tmp_path))  # a directory, not a db
+
+
+@patch(PACKAGE + "query_reverse")
+@patch(PACKAGE + "query_forward")
+def test_api_query(query_forward, query_reverse, capsys):
+    """ Tests api_query
+    """
+    query_forward.return_value = [test.InventoryRecord("foo.com", "api.foo.com", "x", 0)]
+    test.api_query("api*")
+    out, __ = capsys.readouterr()
+    assert "api.foo.com" in out
+    assert query_reverse.call_count == 0
+
+    test.api_query(SAMPLE_TARGET, reverse=True)
+    assert query_reverse.call_args[0] == (SAMPLE_TARGET,)
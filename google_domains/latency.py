@@ -0,0 +1,224 @@
+"""
+    Historical latency store, and ETAs for planned operations
+
+    Every measured phase (login, ls, add, del, ...) is appended to a local JSON-lines
+    file, with its domain and record count. --plan turns those samples into an
+    estimated total, and a per-phase breakdown, without launching a browser
+"""
+from functools import wraps
+import inspect
+import json
+import math
+import os.path
+import time
+from typing import Any, Dict, List, Optional
+from tabulate import tabulate
+from google_domains.utils import click, get_state_path
+
+
+LATENCY_FILENAME = "latency.jsonl"
+
+# Below this many samples for a domain, estimates fall back to similar-sized domains
+MIN_SAMPLES = 3
+
+# Domains are "similar-sized" within this ratio of record counts
+SIMILAR_RECORDS_RATIO = 2.0
+
+# The phases each operation always goes through
+OPERATION_PHASES = {
+    "ls": ["login", "ls"],
+    "add": ["login", "ls", "add"],
+    "del": ["login", "ls", "del"],
+    "rr-ls": ["login", "rr_ls"],
+    "rr-add": ["login", "rr_ls", "rr_set"],
+    "rr-del": ["login", "rr_ls", "rr_set"],
+    "rr-sync": ["login", "rr_ls"],
+    "watch": ["login", "ls", "fingerprint"],
+    "batch": ["login", "ls"],
+    "query": [],
+}
+
+# Samples measured in this process, not yet saved
+SAMPLES: List[Dict[str, Any]] = []
+
+# The last-seen synthetic record count, per domain
+RECORD_COUNTS: Dict[str, int] = {}
+
+
+def measure_latency(phase: str, listing: bool = False):
+    """ Decorator, records the duration of the function as a sample of the phase
+        The function must take a "domain" argument
+        If its a listing, the number of results becomes the domain's record count
+    """
+
+    def decorator(function):
+        signature = inspect.signature(function)
+
+        @wraps(function)
+        def decorated_function(*args, **kwargs):
+            """ the decorating fx
+            """
+            domain = signature.bind(*args, **kwargs).arguments["domain"]
+            start = click()
+            ret = function(*args, **kwargs)
+
+            if listing:
+                RECORD_COUNTS[domain] = len(ret)
+            record_latency(phase, domain, click() - start)
+            return ret
+
+        return decorated_function
+
+    return decorator
+
+
+def record_latency(phase: str, domain: str, ms: int) -> None:
+    """ Records one sample, in memory
+    """
+    SAMPLES.append(
+        {
+            "phase": phase,
+            "domain": domain,
+            "records": RECORD_COUNTS.get(domain),
+            "ms": ms,
+            "at": int(time.time()),
+        }
+    )
+
+
+def save_latencies(path: Optional[str] = None) -> None:
+    """ Appends this process's samples to the store
+    """
+    if not SAMPLES:
+        return
+
+    path = path or get_state_path(LATENCY_FILENAME)
+    with open(path, "a", encoding="utf-8") as file:
+        for sample in SAMPLES:
+            file.write(json.dumps(sample) + "\n")
+
+    SAMPLES.clear()
+
+
+def load_latencies(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """ Returns every stored sample. Skips lines that cant be parsed
+    """
+    path = path or get_state_path(LATENCY_FILENAME)
+    if not os.path.isfile(path):
+        return []
+
+    ret = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                ret.append(json.loads(line))
+            except ValueError:
+                continue
+    return ret
+
+
+def percentile(values: List[int], pct: float) -> int:
+    """ Returns the nearest-rank percentile of the values
+    """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def estimate_phase(samples: List[Dict[str, Any]], phase: str, domain: str) -> Dict:
+    """ Returns the p50 and p90 of the phase. Prefers this domain's samples, then
+        samples from domains with a similar number of records, then everything
+    """
+    phase_samples = [x for x in samples if x["phase"] == phase]
+    records = get_record_count(samples, domain)
+
+    candidates = [
+        [x for x in phase_samples if x["domain"] == domain],
+        [x for x in phase_samples if is_similar_size(x.get("records"), records)],
+        phase_samples,
+    ]
+    values = [x["ms"] for x in candidates[-1]]
+    for candidate in candidates[:-1]:
+        if len(candidate) >= MIN_SAMPLES:
+            values = [x["ms"] for x in candidate]
+            break
+
+    if not values:
+        return {"phase": phase, "samples": 0, "p50": None, "p90": None}
+
+    return {
+        "phase": phase,
+        "samples": len(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+    }
+
+
+def get_record_count(samples: List[Dict[str, Any]], domain: str) -> Optional[int]:
+    """ Returns the most recently seen record count of the domain
+    """
+    ret = None
+    for sample in samples:
+        if sample["domain"] == domain and sample.get("records") is not None:
+            ret = sample["records"]
+    return ret
+
+
+def is_similar_size(records: Optional[int], other: Optional[int]) -> bool:
+    """ Are the two record counts within SIMILAR_RECORDS_RATIO of each other?
+    """
+    if records is None or other is None:
+        return False
+    low, high = sorted([records, other])
+    return high <= max(low, 1) * SIMILAR_RECORDS_RATIO
+
+
+def estimate_plan(
+    phases: List[str], domain: str, samples: List[Dict[str, Any]]
+) -> List[Dict]:
+    """ Returns one estimate per phase, in order
+    """
+    return [estimate_phase(samples, phase, domain) for phase in phases]
+
+
+def print_plan(operation: str, domain: str, path: Optional[str] = None) -> None:
+    """ Prints the estimated time of the operation, without doing it
+    """
+    estimates = estimate_plan(OPERATION_PHASES[operation], domain, load_latencies(path))
+
+    array = []
+    for estimate in estimates:
+        array.append(
+            [
+                estimate["phase"],
+                estimate["samples"],
+                format_ms(estimate["p50"]),
+                format_ms(estimate["p90"]),
+            ]
+        )
+    total_p50 = sum(x["p50"] or 0 for x in estimates)
+    total_p90 = sum(x["p90"] or 0 for x in estimates)
+    array.append(["TOTAL", "", format_ms(total_p50), format_ms(total_p90)])
+    headers = ["Phase", "Samples", "p50", "p90"]
+
+    print()
+    print(f"Plan: {operation} on {domain}")
+    print()
+    print(tabulate(array, headers, tablefmt="simple"))
+    print()
+
+    if any(x["samples"] == 0 for x in estimates):
+        print("Some phases have no history yet. Their time is not included.")
+        print()
+
+
+def format_ms(ms: Optional[int]) -> str:
+    """ Returns the milliseconds as a human-friendly duration
+    """
+    if ms is None:
+        return "?"
+    if ms < 1000:
+        return f"{ms} ms"
+    if ms < 60 * 1000:
+        return f"{ms / 1000:.1f} s"
+    return f"{ms / 60000:.1f} min"
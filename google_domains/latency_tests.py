@@ -0,0 +1,127 @@
+"""
+    Tests for latency
+"""
+from google_domains import latency as test
+
+
+SAMPLE_TLD = "foobar.com"
+
+
+def sample(phase: str, ms: int, domain: str = SAMPLE_TLD, records: int = 10) -> dict:
+    """ Returns a stored sample
+    """
+    return {"phase": phase, "domain": domain, "records": records, "ms": ms, "at": 0}
+
+
+def test_measure_latency():
+    """ Tests measure_latency and record_latency
+    """
+    test.SAMPLES.clear()
+
+    @test.measure_latency("ls", listing=True)
+    def gdomain_ls(browser, domain):  # pylint: disable=unused-argument
+        return {"a": "b", "c": "d"}
+
+    @test.measure_latency("add")
+    def gdomain_add(browser, domain, hostname):  # pylint: disable=unused-argument
+        return None
+
+    gdomain_ls(None, SAMPLE_TLD)
+    gdomain_add(None, hostname="foo", domain=SAMPLE_TLD)
+
+    assert [x["phase"] for x in test.SAMPLES] == ["ls", "add"]
+    assert all(x["domain"] == SAMPLE_TLD for x in test.SAMPLES)
+    assert test.SAMPLES[1]["records"] == 2
+    test.SAMPLES.clear()
+
+
+def test_save_and_load_latencies(tmp_path):
+    """ Tests save_latencies and load_latencies
+    """
+    path = str(tmp_path / "latency.jsonl")
+    assert not test.load_latencies(path)
+
+    # nothing to save, no file
+    test.SAMPLES.clear()
+    test.save_latencies(path)
+    assert not test.load_latencies(path)
+
+    test.record_latency("login", SAMPLE_TLD, 1234)
+    test.save_latencies(path)
+    assert not test.SAMPLES
+
+    # appends, and skips garbage
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("not json\n")
+    test.record_latency("ls", SAMPLE_TLD, 56)
+    test.save_latencies(path)
+
+    response = test.load_latencies(path)
+    assert [x["ms"] for x in response] == [1234, 56]
+
+
+def test_percentile():
+    """ Tests percentile
+    """
+    values = list(range(1, 11))
+    assert test.percentile(values, 50) == 5
+    assert test.percentile(values, 90) == 9
+    assert test.percentile(values, 100) == 10
+    assert test.percentile([7], 90) == 7
+
+
+def test_estimate_phase():
+    """ Tests estimate_phase
+    """
+    samples = [
+        sample("ls", 100),
+        sample("ls", 200),
+        sample("ls", 300),
+        sample("ls", 9000, "big.com", 1000),
+        sample("ls", 20, "small.com", 12),
+        sample("ls", 30, "small.com", 12),
+        sample("ls", 40, "small.com", 12),
+    ]
+
+    # enough samples for this domain
+    response = test.estimate_phase(samples, "ls", SAMPLE_TLD)
+    assert response == {"phase": "ls", "samples": 3, "p50": 200, "p90": 300}
+
+    # not enough for this domain, falls back to similar-sized domains
+    samples.append(sample("ls", 50, "new.com", 8))
+    response = test.estimate_phase(samples, "ls", "new.com")
+    assert response["samples"] == 7
+    assert response["p90"] == 300
+
+    # never seen, falls back to everything
+    response = test.estimate_phase(samples, "ls", "unknown.com")
+    assert response["samples"] == 8
+
+    # no history at all
+    response = test.estimate_phase(samples, "add", SAMPLE_TLD)
+    assert response["samples"] == 0
+    assert response["p50"] is None
+
+
+def test_print_plan(tmp_path, capsys):
+    """ Tests print_plan
+    """
+    path = str(tmp_path / "latency.jsonl")
+    test.record_latency("login", SAMPLE_TLD, 5000)
+    test.record_latency("ls", SAMPLE_TLD, 800)
+    test.save_latencies(path)
+
+    test.print_plan("add", SAMPLE_TLD, path)
+    out, __ = capsys.readouterr()
+    assert "login" in out
+    assert "5.8 s" in out  # the total
+    assert "no history" in out
+
+
+def test_format_ms():
+    """ Tests format_ms
+    """
+    assert test.format_ms(None) == "?"
+    assert test.format_ms(999) == "999 ms"
+    assert test.format_ms(1500) == "1.5 s"
+    assert test.format_ms(90000) == "1.5 min"
@@ -0,0 +1,123 @@
+"""
+    Browser lifecycle management, for long-running sessions
+
+    Long-lived browsers leak memory. BrowserLifecycle owns one logged-in session,
+    and recycles it (quit, reap, log back in) after a number of operations, or
+    when the browser and driver process tree grows past a memory threshold.
+    Callers never see the recycling, they just get a logged-in browser
+
+    Example:
+        with BrowserLifecycle(domain, username, password, max_operations=100) as lifecycle:
+            for hostname in hostnames:
+                with lifecycle.operation() as browser:
+                    api_del(browser, domain, hostname)
+"""
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+from selenium.common.exceptions import WebDriverException
+from splinter import Browser
+from google_domains.api import api_construct, api_destruct
+from google_domains.log import debug
+from google_domains.processes import get_driver_pids, get_rss_bytes
+
+
+BYTES_PER_MB = 1024 * 1024
+
+
+class BrowserLifecycle:
+    """ Owns one logged-in browser session, and recycles it as needed
+        max_operations and max_rss_mb of 0 disable that kind of recycling
+    """
+
+    def __init__(
+        self,
+        domain: str,
+        username: str,
+        password: str,
+        browser_name: str = "firefox",
+        max_operations: int = 0,
+        max_rss_mb: int = 0,
+    ) -> None:  # pylint: disable=too-many-arguments
+        self.domain = domain
+        self.username = username
+        self.password = password
+        self.browser_name = browser_name
+        self.max_operations = max_operations
+        self.max_rss_mb = max_rss_mb
+
+        self.operations = 0
+        self.recycles = 0
+        self._browser: Optional[Browser] = None
+        self._pids: List[int] = []
+
+    def __enter__(self) -> "BrowserLifecycle":
+        return self
+
+    def __exit__(self, the_type, the_value, the_traceback) -> None:
+        self.close()
+
+    @property
+    def browser(self) -> Browser:
+        """ The logged-in browser. Logs in on first use, and after a recycle
+        """
+        if self._browser is None:
+            self._browser = api_construct(
+                self.domain, self.username, self.password, self.browser_name
+            )
+            self._pids = get_driver_pids(self._browser)
+            self.operations = 0
+        return self._browser
+
+    @contextmanager
+    def operation(self) -> Iterator[Browser]:
+        """ Yields the browser for one operation, then recycles it if needed
+            A dead session is recycled before the error is re-raised
+        """
+        try:
+            yield self.browser
+        except WebDriverException:
+            self.recycle("webdriver error")
+            raise
+
+        self.operations += 1
+        reason = self.get_recycle_reason()
+        if reason:
+            self.recycle(reason)
+
+    def get_recycle_reason(self) -> Optional[str]:
+        """ Returns why the session should be recycled, or None if it shouldnt be
+        """
+        if self.max_operations and self.operations >= self.max_operations:
+            return f"{self.operations} operations"
+
+        if self.max_rss_mb:
+            rss_mb = self.get_rss_mb()
+            if rss_mb >= self.max_rss_mb:
+                return f"{rss_mb} MB RSS"
+
+        return None
+
+    def get_rss_mb(self) -> int:
+        """ Returns the resident memory of the driver and browser processes
+            Re-reads the tree, since browsers spawn and retire content processes
+        """
+        if self._pids:
+            self._pids = get_driver_pids(self._browser) or self._pids
+        return get_rss_bytes(self._pids) // BYTES_PER_MB
+
+    def recycle(self, reason: str) -> None:
+        """ Ends this session. The next use of the browser logs back in
+        """
+        debug(f"recycle: {reason}")
+        self.recycles += 1
+        self.close()
+
+    def close(self) -> None:
+        """ Quits the browser, and reaps its processes
+        """
+        browser, self._browser = self._browser, None
+        self._pids = []
+        try:
+            api_destruct(browser)
+        except WebDriverException as e:  # the session was already dead
+            debug(f"  close: {e}")
@@ -0,0 +1,100 @@
+"""
+    Tests for lifecycle
+"""
+from mock import MagicMock, patch  # create_autospec
+import pytest
+from selenium.common.exceptions import WebDriverException
+from google_domains import lifecycle as test
+
+
+PACKAGE = "google_domains.lifecycle."
+
+
+def reset_mocks(*mocks) -> None:
+    """ Resets all the mocks
+    """
+    for mock in mocks:
+        mock.reset_mock()
+
+
+@patch(PACKAGE + "get_rss_bytes")
+@patch(PACKAGE + "get_driver_pids")
+@patch(PACKAGE + "api_destruct")
+@patch(PACKAGE + "api_construct")
+def test_recycle_after_operations(
+    api_construct, api_destruct, get_driver_pids, get_rss_bytes
+):
+    """ Tests recycling after max_operations
+    """
+    api_construct.side_effect = lambda *args: MagicMock()
+    get_driver_pids.return_value = [123]
+    get_rss_bytes.return_value = 0
+
+    with test.BrowserLifecycle("foo.com", "u", "p", max_operations=2) as lifecycle:
+        assert api_construct.call_count == 0  # lazy
+
+        for _ in range(5):
+            with lifecycle.operation() as browser:
+                assert browser
+
+        # logged in for operations 1-2, 3-4, and 5
+        assert api_construct.call_count == 3
+        assert api_destruct.call_count == 2
+        assert lifecycle.recycles == 2
+        assert lifecycle.operations == 1
+
+    # closing reaps the last one
+    assert api_destruct.call_count == 3
+
+
+@patch(PACKAGE + "get_rss_bytes")
+@patch(PACKAGE + "get_driver_pids")
+@patch(PACKAGE + "api_destruct")
+@patch(PACKAGE + "api_construct")
+def test_recycle_on_memory(api_construct, api_destruct, get_driver_pids, get_rss_bytes):
+    """ Tests recycling above max_rss_mb
+    """
+    get_driver_pids.return_value = [123, 456]
+    get_rss_bytes.return_value = 100 * test.BYTES_PER_MB
+
+    lifecycle = test.BrowserLifecycle("foo.com", "u", "p", max_rss_mb=500)
+    with lifecycle.operation():
+        pass
+    assert lifecycle.recycles == 0
+    assert get_rss_bytes.call_args[0][0] == [123, 456]
+
+    get_rss_bytes.return_value = 600 * test.BYTES_PER_MB
+    with lifecycle.operation():
+        pass
+    assert lifecycle.recycles == 1
+    assert api_destruct.call_count == 1
+
+    # transparently logs back in
+    assert lifecycle.browser
+    assert api_construct.call_count == 2
+
+
+@patch(PACKAGE + "get_driver_pids")
+@patch(PACKAGE + "api_destruct")
+@patch(PACKAGE + "api_construct")
+def test_recycle_on_webdriver_error(api_construct, api_destruct, get_driver_pids):
+    """ Tests that a dead session gets recycled, and the error re-raised
+    """
+    get_driver_pids.return_value = []
+    api_destruct.side_effect = WebDriverException("already dead")
+
+    lifecycle = test.BrowserLifecycle("foo.com", "u", "p")
+    with pytest.raises(WebDriverException):
+        with lifecycle.operation():
+            raise WebDriverException("session deleted")
+
+    assert lifecycle.recycles == 1
+    assert api_destruct.call_count == 1
+    assert lifecycle.get_recycle_reason() is None
+
+    # other errors dont recycle
+    with pytest.raises(ValueError):
+        with lifecycle.operation():
+            raise ValueError("nope")
+    assert lifecycle.recycles == 1
+    assert api_construct.call_count == 2
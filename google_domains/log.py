@@ -1,26 +1,101 @@
 """
     Functions for logging
-    TODO: Move to more pythonic logging
+
+    Backed by the logging module. Messages go through a queue, and a listener thread
+    does the I/O, so the hot loops (element polls, timing) never block on a write:
+        - Verbose: debug messages print to stdout, in order with everything else
+        - Quiet: debug messages become progress dots on stderr, at most one per interval
+        - Errors always print to stdout
+        - Optionally, every message is appended to a file as JSON lines
 """
+import atexit
+import json
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
 import sys
+import time
+from typing import List, Optional
 
 VERBOSE = False
 
+# At most one progress dot per this many seconds
+PROGRESS_INTERVAL_SECONDS = 0.25
+
+LOGGER = logging.getLogger("google_domains")
+QUEUE: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+
+
+class ConsoleHandler(logging.Handler):
+    """ Writes messages to stdout, synchronously. Errors are prefixed
+        Looks up sys.stdout on every write, so redirection works
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        message = self.format(record)
+        if record.levelno >= logging.ERROR:
+            message = f"ERROR: {message}"
+        sys.stdout.write(f"{message}\n")
+
+
+class ProgressHandler(logging.Handler):
+    """ Writes a rate-limited progress dot to stderr, when not verbose
+    """
+
+    def __init__(self) -> None:
+        super().__init__(logging.DEBUG)
+        self.last_dot = 0.0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if is_verbose() or record.levelno >= logging.ERROR:
+            return
+
+        now = time.time()
+        if now - self.last_dot < PROGRESS_INTERVAL_SECONDS:
+            return
+        self.last_dot = now
+        sys.stderr.write(".")
+        sys.stderr.flush()
+
+
+class JsonLinesHandler(logging.FileHandler):
+    """ Appends each message to the file, as one line of JSON
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path, encoding="utf-8")
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(
+            {
+                "at": record.created,
+                "level": record.levelname.lower(),
+                "message": record.getMessage(),
+                "thread": record.threadName,
+            }
+        )
+
+
+CONSOLE = ConsoleHandler(logging.ERROR)
+LISTENER = QueueListener(QUEUE, ProgressHandler())
+
+LOGGER.setLevel(logging.DEBUG)
+LOGGER.propagate = False
+LOGGER.addHandler(CONSOLE)
+LOGGER.addHandler(QueueHandler(QUEUE))
+LISTENER.start()
+
 
 def debug(message: str) -> None:
-    """ Prints an message, conditionally
+    """ Logs a message. Printed if verbose, a progress dot if not
     """
-    if is_verbose():
-        print(message)
-    else:
-        sys.stdout.write(".")
-        sys.stdout.flush()
+    LOGGER.debug(message)
 
 
 def error(message: str) -> None:
     """ Prints an error message
     """
-    print(f"ERROR: {message}")
+    LOGGER.error(message)
 
 
 def is_verbose() -> bool:
@@ -34,3 +109,34 @@ def set_verbose(verbosity: bool) -> None:
     """
     global VERBOSE  # pylint: disable=global-statement
     VERBOSE = verbosity
+    CONSOLE.setLevel(logging.DEBUG if verbosity else logging.ERROR)
+
+
+def set_log_file(path: Optional[str]) -> None:
+    """ Also appends every message to the file as JSON lines. None stops that
+    """
+    global LISTENER  # pylint: disable=global-statement
+    LISTENER.stop()
+
+    for handler in LISTENER.handlers:
+        if isinstance(handler, JsonLinesHandler):
+            handler.close()
+
+    handlers: List[logging.Handler] = [ProgressHandler()]
+    if path:
+        handlers.append(JsonLinesHandler(path))
+    LISTENER = QueueListener(QUEUE, *handlers)
+    LISTENER.start()
+
+
+def flush() -> None:
+    """ Waits until the listener has handled every queued message
+    """
+    QUEUE.join()
+
+
+@atexit.register
+def stop() -> None:
+    """ Handles the queued messages, and stops the listener
+    """
+    LISTENER.stop()
@@ -1,6 +1,8 @@
 """
     Tests for log
 """
+import json
+import time
 from google_domains import log as test
 
 
@@ -17,10 +19,28 @@ def test_print(capsys):
     # When VERBOSE is False, it should NOT print anything
     test.set_verbose(False)
     test.debug("foobar")
+    test.flush()
     out, __ = capsys.readouterr()
     assert "foobar" not in out
 
 
+def test_progress(capsys):
+    """ Tests that progress dots go to stderr, rate-limited
+    """
+    test.set_verbose(False)
+    test.flush()
+    capsys.readouterr()
+    time.sleep(test.PROGRESS_INTERVAL_SECONDS)
+
+    for _ in range(100):
+        test.debug("foobar")
+    test.flush()
+
+    out, err = capsys.readouterr()
+    assert not out
+    assert 0 < err.count(".") < 100
+
+
 def test_error(capsys):
     """ Tests error
     """
@@ -29,6 +49,25 @@ def test_error(capsys):
     assert "ERROR: foobaz" in out
 
 
+def test_set_log_file(tmp_path):
+    """ Tests set_log_file
+    """
+    path = str(tmp_path / "log.jsonl")
+    test.set_log_file(path)
+    test.debug("foobar")
+    test.error("foobaz")
+    test.flush()
+    test.set_log_file(None)
+
+    test.debug("not logged")
+    test.flush()
+
+    with open(path, encoding="utf-8") as file:
+        lines = [json.loads(x) for x in file]
+    assert [x["message"] for x in lines] == ["foobar", "foobaz"]
+    assert [x["level"] for x in lines] == ["debug", "error"]
+
+
 def test_verbosity():
     """ Tests verbosity attribute
     """
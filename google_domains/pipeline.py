@@ -0,0 +1,172 @@
+"""
+    Pipelined execution of batch mutations
+
+    Serially, each mutation fills its form, submits it, and then waits for the save.
+    Pipelined, the next add's form gets filled in while the previous save is in flight:
+
+        serial:     fill 1, submit 1, wait 1, fill 2, submit 2, wait 2, ...
+        pipelined:  fill 1, submit 1, fill 2, wait 1, submit 2, fill 3, wait 2, ...
+
+    Each save's notification is dismissed once its seen, so the next one belongs to the
+    next mutation. On any ambiguity (more than one notification, or a prepared form that
+    the save reset) it falls back to serial for the rest of the batch.
+    Deletes open a modal dialog, so only adds are prepared ahead.
+    The CDP backend fills and submits in one round trip already, so it runs serially
+"""
+from typing import Callable, List, NamedTuple, Optional
+from splinter import Browser
+from google_domains.api import (
+    DELETE_MODAL_TITLE,
+    count_notifications,
+    dismiss_notifications,
+    gdomain_add,
+    gdomain_add_prepare,
+    gdomain_add_submit,
+    gdomain_del,
+    gdomain_del_prepare,
+    gdomain_del_submit,
+    get_add_form_values,
+    wait_for_success_notification,
+)
+from google_domains.cdp import CdpBrowser
+from google_domains.log import debug
+from google_domains.utils import fqdn, un_fqdn
+
+
+class Mutation(NamedTuple):
+    """ One browser mutation. action is "add" or "del". hostname is fully qualified
+    """
+
+    action: str
+    hostname: str
+    target: str = ""
+
+
+class PipelinedExecutor:
+    """ Runs mutations on one browser, preparing each add while the last save is in flight
+        before_submit and after_save are hooks, ie: for rate governing and caching
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        domain: str,
+        before_submit: Optional[Callable[[Mutation], None]] = None,
+        after_save: Optional[Callable[[Mutation, bool], None]] = None,
+    ) -> None:
+        self.browser = browser
+        self.domain = domain
+        self.before_submit = before_submit
+        self.after_save = after_save
+
+        self.serial = False
+        self.in_flight: Optional[Mutation] = None
+        self.saved: List[Mutation] = []
+
+    def run(self, mutations: List[Mutation]) -> None:
+        """ Runs the mutations in order, and waits for the last one to save
+        """
+        if isinstance(self.browser, CdpBrowser):
+            for mutation in mutations:
+                self.run_serially(mutation)
+            return
+
+        for mutation in mutations:
+            self.start(mutation)
+        self.finish()
+
+    def run_serially(self, mutation: Mutation) -> None:
+        """ Runs the whole mutation, and waits for it to save
+        """
+        if self.before_submit:
+            self.before_submit(mutation)
+        try:
+            if mutation.action == "add":
+                gdomain_add(self.browser, self.domain, mutation.hostname, mutation.target)
+            else:
+                gdomain_del(self.browser, self.domain, mutation.hostname)
+        except Exception:
+            if self.after_save:
+                self.after_save(mutation, False)
+            raise
+
+        self.saved.append(mutation)
+        if self.after_save:
+            self.after_save(mutation, True)
+
+    def start(self, mutation: Mutation) -> None:
+        """ Prepares and submits the mutation, overlapping the in-flight save if it can
+        """
+        prepared = False
+        if mutation.action == "add" and self.can_overlap(mutation):
+            gdomain_add_prepare(self.browser, self.domain, mutation.hostname, mutation.target)
+            self.finish()
+            prepared = self.is_still_prepared(mutation)
+            if not prepared:
+                self.fall_back("the save reset the prepared form")
+        else:
+            self.finish()
+
+        if mutation.action == "add":
+            if not prepared:
+                gdomain_add_prepare(
+                    self.browser, self.domain, mutation.hostname, mutation.target
+                )
+            self.submit(mutation, gdomain_add_submit)
+        elif mutation.action == "del":
+            gdomain_del_prepare(self.browser, self.domain, mutation.hostname)
+            self.submit(mutation, gdomain_del_submit)
+        else:
+            raise ValueError(f"Unsupported mutation: {mutation.action}")
+
+    def can_overlap(self, mutation: Mutation) -> bool:
+        """ Can the mutation be prepared while the in-flight one saves?
+        """
+        if self.serial or not self.in_flight:
+            return False
+        return self.in_flight.hostname != mutation.hostname
+
+    def submit(self, mutation: Mutation, function: Callable[[Browser], None]) -> None:
+        """ Submits the prepared mutation, without waiting for it to save
+        """
+        if self.before_submit:
+            self.before_submit(mutation)
+        dismiss_notifications(self.browser)
+        function(self.browser)
+        self.in_flight = mutation
+
+    def finish(self) -> None:
+        """ Waits for the in-flight mutation to save, if theres one
+        """
+        mutation, self.in_flight = self.in_flight, None
+        if not mutation:
+            return
+
+        try:
+            modal = DELETE_MODAL_TITLE if mutation.action == "del" else None
+            wait_for_success_notification(self.browser, modal)
+        except Exception:
+            if self.after_save:
+                self.after_save(mutation, False)
+            raise
+
+        if count_notifications(self.browser) > 1:
+            self.fall_back("more than one notification")
+        dismiss_notifications(self.browser)
+
+        self.saved.append(mutation)
+        if self.after_save:
+            self.after_save(mutation, True)
+
+    def is_still_prepared(self, mutation: Mutation) -> bool:
+        """ Does the add form still hold what was filled in?
+        """
+        hostname = un_fqdn(fqdn(mutation.hostname, self.domain), self.domain)
+        return get_add_form_values(self.browser) == [hostname, mutation.target]
+
+    def fall_back(self, reason: str) -> None:
+        """ Runs the rest of the batch serially
+        """
+        if not self.serial:
+            debug(f"pipeline: serial from now on, {reason}")
+        self.serial = True
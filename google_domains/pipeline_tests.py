@@ -0,0 +1,104 @@
+"""
+    Tests for pipeline
+"""
+import os.path
+from mock import MagicMock, patch  # create_autospec
+import pytest
+from google_domains import pipeline as test
+from google_domains.replay import load_fixture
+
+
+PACKAGE = "google_domains.pipeline."
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "dns.html")
+SAMPLE_TLD = "foobar.com"
+SAMPLE_TARGET = "https://dweeb.com"
+
+
+def load_replay():
+    """ Returns an in-process browser of the DNS page fixture
+    """
+    pytest.importorskip("lxml")
+    return load_fixture(FIXTURE)
+
+
+def texts(browser) -> list:
+    """ Returns the text of everything clicked, skipping notification dismissals
+    """
+    return [x.text for x in browser.clicks if x.text != "Dismiss"]
+
+
+def test_run_replay():
+    """ Tests a pipelined batch against the fixture
+    """
+    browser = load_replay()
+    saved = []
+    executor = test.PipelinedExecutor(
+        browser, SAMPLE_TLD, after_save=lambda mutation, ok: saved.append((mutation, ok))
+    )
+    mutations = [
+        test.Mutation("add", f"foo.{SAMPLE_TLD}", SAMPLE_TARGET),
+        test.Mutation("add", f"bar.{SAMPLE_TLD}", SAMPLE_TARGET),
+        test.Mutation("del", f"api.{SAMPLE_TLD}"),
+    ]
+
+    # how many fills had happened, at each wait for a save
+    fills_at_wait = []
+    with patch(PACKAGE + "wait_for_success_notification") as wait:
+        wait.side_effect = lambda x, modal: fills_at_wait.append(len(browser.fills))
+        executor.run(mutations)
+
+    # the second add was filled in before the first one's save was waited on
+    assert fills_at_wait == [4, 4, 4]
+    assert executor.saved == mutations
+    assert all(ok for __, ok in saved)
+    assert not executor.serial
+    assert [x[1] for x in browser.fills] == ["foo", SAMPLE_TARGET, "bar", SAMPLE_TARGET]
+
+    toggles = ["Temporary redirect (302)", "Forward path", "Enable SSL"]
+    assert texts(browser) == toggles + ["Add"] + toggles + ["Add", "Delete", "Delete"]
+
+
+@patch(PACKAGE + "wait_for_success_notification")
+@patch(PACKAGE + "get_add_form_values")
+@patch(PACKAGE + "count_notifications")
+@patch(PACKAGE + "dismiss_notifications")
+@patch(PACKAGE + "gdomain_add_submit")
+@patch(PACKAGE + "gdomain_add_prepare")
+def test_fall_back(
+    gdomain_add_prepare, gdomain_add_submit, _, count_notifications, get_add_form_values, __
+):  # pylint: disable=too-many-arguments
+    """ Tests falling back to serial, when the save resets the prepared form
+    """
+    count_notifications.return_value = 1
+    get_add_form_values.return_value = ["", ""]
+
+    executor = test.PipelinedExecutor(MagicMock(), SAMPLE_TLD)
+    executor.run([test.Mutation("add", f"{x}.{SAMPLE_TLD}", SAMPLE_TARGET) for x in "abcd"])
+
+    # b was prepared twice, since the save reset it. Then c and d serially, once each
+    assert [x[0][2] for x in gdomain_add_prepare.call_args_list] == ["a.foobar.com", "b.foobar.com", "b.foobar.com", "c.foobar.com", "d.foobar.com"]  # noqa  # pylint: disable=line-too-long
+    assert gdomain_add_submit.call_count == 4
+    assert executor.serial
+    assert get_add_form_values.call_count == 1
+
+
+@patch(PACKAGE + "wait_for_success_notification")
+@patch(PACKAGE + "dismiss_notifications")
+@patch(PACKAGE + "gdomain_add_submit")
+@patch(PACKAGE + "gdomain_add_prepare")
+def test_failure(gdomain_add_prepare, gdomain_add_submit, _, wait_for_success_notification):
+    """ Tests that a failed save is reported, and raised
+    """
+    wait_for_success_notification.side_effect = RuntimeError("nope")
+    before_submit = MagicMock()
+    after_save = MagicMock()
+
+    executor = test.PipelinedExecutor(MagicMock(), SAMPLE_TLD, before_submit, after_save)
+    mutation = test.Mutation("add", f"foo.{SAMPLE_TLD}", SAMPLE_TARGET)
+    with pytest.raises(RuntimeError):
+        executor.run([mutation])
+
+    assert gdomain_add_prepare.call_count == gdomain_add_submit.call_count == 1
+    assert before_submit.call_args[0] == (mutation,)
+    assert after_save.call_args[0] == (mutation, False)
+    assert not executor.saved
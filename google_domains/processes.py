@@ -0,0 +1,140 @@
+"""
+    Functions for the browser and driver process tree
+    Reads /proc, so memory accounting is Linux-only. Elsewhere RSS reads as 0
+"""
+import os
+import signal
+import time
+from typing import Dict, List
+from splinter import Browser
+from google_domains.log import debug
+
+
+PROC = "/proc"
+
+# How long to wait for SIGTERMed processes, before SIGKILLing them
+REAP_GRACE_SECONDS = 2.0
+
+
+def get_driver_pids(browser: Browser) -> List[int]:
+    """ Returns the driver's pid, and all its descendants (ie: the browser)
+        For the CDP backend, the browser is the driver
+        Returns an empty list for remote drivers, which have no local process
+    """
+    try:
+        pid = browser.driver.service.process.pid
+    except AttributeError:
+        pid = getattr(getattr(browser, "process", None), "pid", None)
+
+    if not isinstance(pid, int):
+        return []
+
+    return [pid] + get_descendants(pid)
+
+
+def get_parents() -> Dict[int, int]:
+    """ Returns a dict of pid to parent pid, for every process
+    """
+    ret: Dict[int, int] = {}
+    if not os.path.isdir(PROC):
+        return ret
+
+    for entry in os.listdir(PROC):
+        if not entry.isdigit():
+            continue
+        fields = get_stat_fields(int(entry))
+        if fields:  # else it exited while we were looking
+            ret[int(entry)] = int(fields[1])
+
+    return ret
+
+
+def get_descendants(pid: int) -> List[int]:
+    """ Returns the pids of every descendant of the pid
+    """
+    parents = get_parents()
+    ret: List[int] = []
+    frontier = [pid]
+    while frontier:
+        children = [x for x, parent in parents.items() if parent in frontier]
+        ret.extend(children)
+        frontier = children
+    return ret
+
+
+def get_rss_bytes(pids: List[int]) -> int:
+    """ Returns the total resident memory of the pids
+    """
+    page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+    ret = 0
+    for pid in pids:
+        try:
+            with open(f"{PROC}/{pid}/statm", encoding="utf-8") as file:
+                ret += int(file.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return ret
+
+
+def is_running(pid: int) -> bool:
+    """ Is the process still alive?
+    """
+    try:
+        os.waitpid(pid, os.WNOHANG)  # collects it, if its an exited child of ours
+    except ChildProcessError:
+        pass
+
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+
+    # zombies are dead, just not collected by their parent yet
+    fields = get_stat_fields(pid)
+    return not fields or fields[0] != "Z"
+
+
+def get_stat_fields(pid: int) -> List[str]:
+    """ Returns the fields of /proc/<pid>/stat after the command name, starting with state
+        Returns an empty list if theres no such process, or no /proc
+    """
+    try:
+        with open(f"{PROC}/{pid}/stat", encoding="utf-8") as file:
+            stat = file.read()
+    except OSError:
+        return []
+
+    # the command name can contain spaces and parens, so split after the last paren
+    after_command = stat.rfind(")") + 2
+    return stat[after_command:].split()
+
+
+def reap_processes(pids: List[int]) -> List[int]:
+    """ Terminates any of the pids that are still running. Returns the ones it had to kill
+    """
+    ret = [x for x in pids if is_running(x)]
+    if not ret:
+        return ret
+
+    debug(f"   reap: {ret}")
+    for pid in ret:
+        signal_process(pid, signal.SIGTERM)
+
+    deadline = time.time() + REAP_GRACE_SECONDS
+    while time.time() < deadline and any(is_running(x) for x in ret):
+        time.sleep(0.1)
+
+    for pid in ret:
+        if is_running(pid):
+            signal_process(pid, signal.SIGKILL)
+
+    return ret
+
+
+def signal_process(pid: int, sig: int) -> None:
+    """ Sends the signal, ignoring processes that are already gone
+    """
+    try:
+        os.kill(pid, sig)
+    except OSError:
+        pass
@@ -0,0 +1,70 @@
+"""
+    Tests for processes
+"""
+import os
+import subprocess
+import sys
+from mock import MagicMock, patch  # create_autospec
+import pytest
+from google_domains import processes as test
+
+
+PACKAGE = "google_domains.processes."
+
+needs_proc = pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+
+
+def sleeper() -> subprocess.Popen:
+    """ Returns a child process that sleeps, that spawns its own child
+    """
+    script = "import subprocess, sys, time; subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); time.sleep(60)"  # noqa  # pylint: disable=line-too-long
+    process = subprocess.Popen([sys.executable, "-c", script])
+    return process
+
+
+def test_get_driver_pids():
+    """ Tests get_driver_pids
+    """
+    # remote drivers, and mocks, have no local pid
+    assert test.get_driver_pids(MagicMock()) == []
+    assert test.get_driver_pids(MagicMock(driver=object())) == []
+
+    with patch(PACKAGE + "get_descendants") as get_descendants:
+        get_descendants.return_value = [456]
+        browser = MagicMock()
+        browser.driver.service.process.pid = 123
+        assert test.get_driver_pids(browser) == [123, 456]
+
+        # the CDP backend runs the browser itself
+        browser = MagicMock(driver=object())
+        browser.process.pid = 789
+        assert test.get_driver_pids(browser) == [789, 456]
+
+
+@needs_proc
+def test_process_tree_and_reaping():
+    """ Tests get_descendants, get_rss_bytes, and reap_processes
+    """
+    process = sleeper()
+    try:
+        # wait for the grandchild to show up
+        for _ in range(50):
+            descendants = test.get_descendants(process.pid)
+            if descendants:
+                break
+            test.time.sleep(0.1)
+
+        assert len(descendants) == 1
+        assert process.pid in test.get_descendants(os.getpid())
+
+        pids = [process.pid] + descendants
+        assert test.get_rss_bytes(pids) > 0
+        assert test.get_rss_bytes([]) == 0
+
+        assert sorted(test.reap_processes(pids)) == sorted(pids)
+        assert not any(test.is_running(x) for x in pids)
+        assert test.reap_processes(pids) == []
+
+    finally:
+        process.kill()
+        process.wait()
@@ -0,0 +1,105 @@
+"""
+    WebDriver round-trip profiler
+
+    Every .html, .visible, .text and find_by_* is an HTTP round trip to the driver.
+    enable_profiling() wraps the command executor, so every remote command is counted,
+    timed, and attributed to the google_domains function that issued it.
+    print_profile() ranks those functions by the time they spent waiting on the driver
+"""
+from collections import Counter, defaultdict
+import sys
+import time
+from types import FrameType
+from typing import Callable, DefaultDict, Dict, List, Optional, Tuple
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from tabulate import tabulate
+from google_domains.cdp import CdpBrowser
+
+
+# Frames in these google_domains modules are wrappers, not callers
+SKIPPED_MODULES = {"profiler", "utils", "latency", "cdp"}
+
+# How many of each function's commands to show
+TOP_COMMANDS = 3
+
+# function name -> command name -> durations in ms
+STATS: DefaultDict[str, DefaultDict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+
+# The unwrapped methods, while profiling
+ORIGINALS: Dict[str, Callable] = {}
+
+
+def enable_profiling() -> None:
+    """ Starts profiling every WebDriver command, and every DevTools command
+    """
+    if ORIGINALS:
+        return
+
+    ORIGINALS["execute"] = RemoteConnection.execute
+    ORIGINALS["send"] = CdpBrowser.send
+    RemoteConnection.execute = profiled(RemoteConnection.execute)  # type: ignore
+    CdpBrowser.send = profiled(CdpBrowser.send)  # type: ignore
+
+
+def disable_profiling() -> None:
+    """ Stops profiling
+    """
+    if ORIGINALS:
+        RemoteConnection.execute = ORIGINALS.pop("execute")  # type: ignore
+        CdpBrowser.send = ORIGINALS.pop("send")  # type: ignore
+
+
+def profiled(method: Callable) -> Callable:
+    """ Wraps a method whose first arg is the command name, to record its timing
+    """
+
+    def decorated_function(self, command, *args, **kwargs):
+        """ the decorating fx
+        """
+        started = time.perf_counter()
+        try:
+            return method(self, command, *args, **kwargs)
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            STATS[get_caller()][command].append(ms)
+
+    return decorated_function
+
+
+def get_caller() -> str:
+    """ Returns the name of the innermost google_domains function on the stack
+    """
+    frame: Optional[FrameType] = sys._getframe(1)  # pylint: disable=protected-access
+    while frame:
+        *packages, module = frame.f_globals.get("__name__", "").split(".")
+        if "google_domains" in packages and module not in SKIPPED_MODULES:
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return "(other)"
+
+
+def print_profile() -> None:
+    """ Prints the functions ranked by total round-trip time, with their top commands
+    """
+    rows: List[Tuple[str, int, float, str]] = []
+    for function, commands in STATS.items():
+        durations = [x for values in commands.values() for x in values]
+        counts = Counter({name: len(values) for name, values in commands.items()})
+        top = ", ".join(f"{name} x{count}" for name, count in counts.most_common(TOP_COMMANDS))
+        rows.append((function, len(durations), sum(durations), top))
+
+    rows.sort(key=lambda x: x[2], reverse=True)
+    total_commands = sum(x[1] for x in rows)
+    total_ms = sum(x[2] for x in rows)
+
+    array = [
+        [function, count, round(ms), round(ms / count, 1), top]
+        for function, count, ms, top in rows
+    ]
+    headers = ["Function", "Round trips", "Total ms", "Mean ms", "Top commands"]
+
+    print()
+    print(f"Profile: {total_commands} round trips, {round(total_ms)} ms")
+    print()
+    print(tabulate(array, headers, tablefmt="simple"))
+    print()
@@ -0,0 +1,54 @@
+"""
+    Tests for profiler
+"""
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from google_domains import profiler as test
+from google_domains.cdp import CdpBrowser
+
+
+def fake_execute(self, command, params):  # pylint: disable=unused-argument
+    """ Stands in for RemoteConnection.execute
+    """
+    return {"value": command}
+
+
+def does_element_exist(execute):
+    """ Stands in for an api.py function that makes round trips
+    """
+    execute(None, "findElements", {})
+    execute(None, "getElementText", {})
+    execute(None, "findElements", {})
+
+
+def test_profiled(capsys):
+    """ Tests profiled, and print_profile
+    """
+    test.STATS.clear()
+    execute = test.profiled(fake_execute)
+    assert execute(None, "get", {}) == {"value": "get"}
+    does_element_exist(execute)
+
+    assert set(test.STATS) == {"test_profiled", "does_element_exist"}
+    assert len(test.STATS["does_element_exist"]["findElements"]) == 2
+
+    test.print_profile()
+    out, __ = capsys.readouterr()
+    assert "4 round trips" in out
+    assert "findElements x2, getElementText x1" in out
+    test.STATS.clear()
+
+
+def test_enable_profiling():
+    """ Tests enable_profiling and disable_profiling
+    """
+    execute = RemoteConnection.execute
+    send = CdpBrowser.send
+
+    test.enable_profiling()
+    test.enable_profiling()  # idempotent
+    assert RemoteConnection.execute is not execute
+    assert CdpBrowser.send is not send
+
+    test.disable_profiling()
+    assert RemoteConnection.execute is execute
+    assert CdpBrowser.send is send
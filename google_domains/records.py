@@ -0,0 +1,325 @@
+"""
+    CRUD operations for Custom resource records (A, AAAA, CNAME, MX, TXT)
+
+    Records are managed as whole record sets: every data value for a name/type
+    pair is written in a single save, so the per-save notification wait is paid
+    once per set instead of once per value
+"""
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from splinter import Browser
+from splinter.driver.webdriver import WebDriverElement
+from tabulate import tabulate
+import yaml
+from google_domains.api import (
+    get_element_by_placeholder,
+    get_element_by_substring,
+    wait_for_success_notification,
+    wait_for_tag,
+)
+from google_domains.latency import measure_latency
+from google_domains.log import debug, is_verbose
+from google_domains.utils import fqdn, un_fqdn, print_timing
+
+
+# The record types we know how to manage
+RECORD_TYPES = ["A", "AAAA", "CNAME", "MX", "TXT"]
+
+# Placeholders of the non-data inputs in the record forms
+NAME_PLACEHOLDER = "@"
+TTL_PLACEHOLDER = "1H"
+
+RR_DELETE_MODAL_TITLE = "Delete resource record?"
+
+# The registrar's default TTL, in seconds
+DEFAULT_TTL = 3600
+
+# Multipliers for the TTL suffixes the registrar displays, ie: "1h", "5m"
+TTL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+class ResourceRecord(NamedTuple):
+    """ One record set: every data value for a name and type
+    """
+
+    name: str
+    type: str
+    ttl: int
+    data: List[str]
+
+
+# Type aliases
+RecordKey = Tuple[str, str]  # name, type
+RecordSets = Dict[RecordKey, ResourceRecord]
+
+
+def api_rr_ls(browser: Browser, domain: str) -> None:
+    """ Prints the current list of custom resource records
+    """
+    record_sets = gdomain_rr_ls(browser, domain)
+
+    array = []
+    for record in record_sets.values():
+        array.append([record.name, record.type, record.ttl, "\n".join(record.data)])
+    headers = ["Name", "Type", "TTL", "Data"]
+
+    print()
+    print(tabulate(array, headers, tablefmt="simple"))
+    print()
+
+
+def api_rr_add(browser: Browser, domain: str, record: ResourceRecord) -> None:
+    """ Adds the data values to the record set, creating it if needed
+        A TTL of 0 keeps the current TTL
+    """
+    record = normalize_record(record, domain)
+    record_sets = gdomain_rr_ls(browser, domain)
+    key = (record.name, record.type)
+
+    existing = record_sets.get(key)
+    if existing:
+        data = existing.data + [x for x in record.data if x not in existing.data]
+        record = record._replace(data=data, ttl=record.ttl or existing.ttl)
+    else:
+        record = record._replace(ttl=record.ttl or DEFAULT_TTL)
+
+    if existing and existing == record:
+        print(f"{record.name} {record.type} already up to date. Doing nothing.")
+        return
+
+    gdomain_rr_set(browser, domain, record, existing is not None)
+
+    if is_verbose():
+        api_rr_ls(browser, domain)
+
+
+def api_rr_del(browser: Browser, domain: str, record: ResourceRecord) -> None:
+    """ Removes the data values from the record set
+        Removes the whole record set if no data values are passed in, or none are left
+    """
+    record = normalize_record(record, domain)
+    record_sets = gdomain_rr_ls(browser, domain)
+    key = (record.name, record.type)
+
+    existing = record_sets.get(key)
+    if not existing:
+        print(f"Record not found: {record.name} {record.type}. Doing nothing.")
+        return
+
+    remaining = [x for x in existing.data if x not in record.data]
+    if record.data and remaining:
+        gdomain_rr_set(browser, domain, existing._replace(data=remaining), True)
+    else:
+        gdomain_rr_del(browser, domain, existing)
+
+    if is_verbose():
+        api_rr_ls(browser, domain)
+
+
+def api_rr_sync(browser: Browser, domain: str, path: str) -> None:
+    """ Makes the custom resource records match the YAML file at the path
+        Record sets that are already correct are left untouched
+    """
+    desired = read_records_file(path, domain)
+    current = gdomain_rr_ls(browser, domain)
+
+    changed = deleted = 0
+    for key, record in desired.items():
+        if current.get(key) != record:
+            gdomain_rr_set(browser, domain, record, key in current)
+            changed += 1
+
+    for key, record in current.items():
+        if key not in desired:
+            gdomain_rr_del(browser, domain, record)
+            deleted += 1
+
+    unchanged = len(desired) - changed
+    print(f"Synced {path}: {changed} set, {deleted} deleted, {unchanged} unchanged")
+
+    if is_verbose():
+        api_rr_ls(browser, domain)
+
+
+@print_timing
+@measure_latency("rr_ls")
+def gdomain_rr_ls(browser: Browser, domain: str) -> RecordSets:
+    """ Returns a dict of (name, type) to record sets
+    """
+    records = get_custom_records_div(browser)
+
+    ret = {}
+    for row in records.find_by_tag("tr"):
+        cells = row.find_by_tag("td")
+        if len(cells) < 4:  # skips the header row
+            continue
+
+        name, the_type, ttl = [cells[i].text.strip() for i in range(3)]
+        if the_type.upper() not in RECORD_TYPES:  # ie: NS, SRV. Not ours to manage
+            continue
+
+        data = [x.text.strip() for x in cells[3].find_by_tag("div")]
+        record = ResourceRecord(name, the_type, ttl_seconds(ttl), data)
+        record = normalize_record(record, domain)
+        ret[(record.name, record.type)] = record
+
+    return ret
+
+
+@print_timing
+@measure_latency("rr_set")
+def gdomain_rr_set(
+    browser: Browser, domain: str, record: ResourceRecord, exists: bool
+) -> None:
+    """ Writes the whole record set in a single save
+        Edits the existing row if the set exists, otherwise uses the add form
+    """
+    records = get_custom_records_div(browser)
+
+    if exists:
+        row = get_record_row(records, record)
+        get_element_by_substring("Edit", row.find_by_tag("button")).click()
+        wait_for_tag(browser, "button", "Save")
+        form = get_element_by_substring("Save", records.find_by_tag("form"))
+        save_text = "Save"
+    else:
+        form = get_element_by_substring("Add", records.find_by_tag("form"))
+        get_element_by_placeholder(form, NAME_PLACEHOLDER).fill(record.name)
+        form.find_by_tag("select").first.select(record.type)
+        save_text = "Add"
+
+    get_element_by_placeholder(form, TTL_PLACEHOLDER).fill(str(record.ttl))
+    fill_data_inputs(form, domain, record.data)
+
+    form.find_by_text(save_text).click()
+    wait_for_success_notification(browser)
+
+
+@print_timing
+@measure_latency("rr_del")
+def gdomain_rr_del(browser: Browser, domain: str, record: ResourceRecord) -> None:
+    """ Deletes the whole record set
+    """
+    debug(f"rr_del: {record.name} {record.type} in {domain}")
+
+    records = get_custom_records_div(browser)
+    row = get_record_row(records, record)
+    get_element_by_substring("Delete", row.find_by_tag("button")).click()
+
+    wait_for_tag(browser, "h3", RR_DELETE_MODAL_TITLE)
+    modal_form = get_element_by_substring(RR_DELETE_MODAL_TITLE, browser.find_by_tag("form"))
+    modal_button = get_element_by_substring("Delete", modal_form.find_by_tag("button"))
+    modal_button.click()
+
+    wait_for_success_notification(browser, RR_DELETE_MODAL_TITLE)
+
+
+def fill_data_inputs(form: WebDriverElement, domain: str, data: List[str]) -> None:
+    """ Fills one data input per value. Adds inputs with the "+" button as needed
+        Leftover inputs are cleared, and the registrar drops empty values on save
+    """
+    inputs = get_data_inputs(form)
+    while len(inputs) < len(data):
+        form.find_by_text("+").click()
+        more = get_data_inputs(form)
+        if len(more) == len(inputs):
+            raise RuntimeError(f"Could not add a data input for {domain}")
+        inputs = more
+
+    for i, element in enumerate(inputs):
+        element.fill(data[i] if i < len(data) else "")
+
+
+def get_data_inputs(form: WebDriverElement) -> List[WebDriverElement]:
+    """ Returns the data inputs of the form. Their placeholder depends on the record type
+        so they are everything that isnt the name or TTL
+    """
+    skip = [f'placeholder="{x}"' for x in [NAME_PLACEHOLDER, TTL_PLACEHOLDER]]
+    return [
+        x
+        for x in form.find_by_tag("input")
+        if not any(placeholder in x.outer_html for placeholder in skip)
+    ]
+
+
+def get_custom_records_div(browser: Browser) -> WebDriverElement:
+    """ Returns the parent div of the "Custom resource records" h3
+    """
+    xpath = '//h3[contains(text(), "Custom resource records")]/..'
+    return browser.find_by_xpath(xpath).first
+
+
+def get_record_row(
+    records: WebDriverElement, record: ResourceRecord
+) -> WebDriverElement:
+    """ Returns the table row of the record set
+    """
+    xpath = (
+        f'.//tr[td[1][normalize-space()="{record.name}"]]'
+        f'[td[2][normalize-space()="{record.type}"]]'
+    )
+    rows = records.find_by_xpath(xpath)
+    if not rows:
+        raise RuntimeError(f"Record not found: {record.name} {record.type}")
+    return rows.first
+
+
+def read_records_file(path: str, domain: str) -> RecordSets:
+    """ Reads the desired record sets from a YAML file, like:
+            - name: www
+              type: A
+              ttl: 3600
+              data: [1.2.3.4, 5.6.7.8]
+    """
+    with open(path, encoding="utf-8") as file:
+        entries = yaml.load(file, Loader=yaml.FullLoader) or []
+
+    ret: RecordSets = {}
+    for entry in entries:
+        data = entry["data"]
+        record = ResourceRecord(
+            name=str(entry.get("name", NAME_PLACEHOLDER)),
+            type=entry["type"],
+            ttl=ttl_seconds(str(entry.get("ttl", DEFAULT_TTL))),
+            data=[str(x) for x in (data if isinstance(data, list) else [data])],
+        )
+        record = normalize_record(record, domain)
+        ret[(record.name, record.type)] = record
+
+    return ret
+
+
+def normalize_record(record: ResourceRecord, domain: str) -> ResourceRecord:
+    """ Returns the record with a relative name, and an upper-case type
+    """
+    the_type = record.type.upper()
+    if the_type not in RECORD_TYPES:
+        raise RuntimeError(f"Unsupported record type: {record.type}")
+
+    return record._replace(name=relative_name(record.name, domain), type=the_type)
+
+
+def relative_name(name: str, domain: str) -> str:
+    """ Returns the name relative to the domain, with "@" for the domain itself
+    """
+    if name in ["", NAME_PLACEHOLDER] or name.strip(".") == domain:
+        return NAME_PLACEHOLDER
+    return un_fqdn(fqdn(name, domain), domain)
+
+
+def ttl_seconds(ttl: str) -> int:
+    """ Returns the TTL in seconds. Accepts the registrar's display format, ie: "1h"
+    """
+    ttl = ttl.strip().lower()
+    if ttl and ttl[-1] in TTL_UNITS:
+        return int(ttl[:-1]) * TTL_UNITS[ttl[-1]]
+    return int(ttl)
+
+
+def parse_record(
+    name: str, the_type: str, ttl: Optional[str], data: List[str]
+) -> ResourceRecord:
+    """ Returns a ResourceRecord from command-line args
+        Without a TTL, the TTL is 0, meaning "keep the current one"
+    """
+    ttl_value = ttl_seconds(ttl) if ttl else 0
+    return ResourceRecord(name, the_type, ttl_value, [x for x in data if x])
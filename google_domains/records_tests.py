@@ -0,0 +1,190 @@
+"""
+    Tests for records
+"""
+import os.path
+from mock import patch  # create_autospec
+import pytest
+from google_domains import records as test
+from google_domains.replay import load_fixture
+
+
+PACKAGE = "google_domains.records."
+SAMPLE_TLD = "foobar.com"
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "dns.html")
+
+APEX = test.ResourceRecord("@", "A", 3600, ["1.2.3.4", "5.6.7.8"])
+WWW = test.ResourceRecord("www", "CNAME", 300, ["foobar.com."])
+
+
+def reset_mocks(*mocks) -> None:
+    """ Resets all the mocks
+    """
+    for mock in mocks:
+        mock.reset_mock()
+
+
+@patch(PACKAGE + "is_verbose")
+@patch(PACKAGE + "gdomain_rr_ls")
+@patch(PACKAGE + "gdomain_rr_set")
+def test_api_rr_add(gdomain_rr_set, gdomain_rr_ls, is_verbose, capsys):
+    """ Test api_rr_add
+    """
+    is_verbose.return_value = False
+    gdomain_rr_ls.return_value = {("@", "A"): APEX}
+
+    # New record set, gets the default TTL
+    record = test.ResourceRecord("mail", "mx", 0, ["10 mx.foobar.com."])
+    test.api_rr_add(None, SAMPLE_TLD, record)
+    assert gdomain_rr_set.call_count == 1
+    written, exists = gdomain_rr_set.call_args[0][2:]
+    assert written == test.ResourceRecord("mail", "MX", 3600, ["10 mx.foobar.com."])
+    assert exists is False
+    reset_mocks(gdomain_rr_set, gdomain_rr_ls)
+
+    # Existing record set, all the values get written in one save
+    record = test.ResourceRecord(SAMPLE_TLD, "A", 0, ["9.9.9.9", "1.2.3.4"])
+    test.api_rr_add(None, SAMPLE_TLD, record)
+    assert gdomain_rr_set.call_count == 1
+    written, exists = gdomain_rr_set.call_args[0][2:]
+    assert written.data == ["1.2.3.4", "5.6.7.8", "9.9.9.9"]
+    assert written.ttl == 3600
+    assert exists is True
+    reset_mocks(gdomain_rr_set, gdomain_rr_ls)
+
+    # Already there, does nothing
+    record = test.ResourceRecord("@", "A", 0, ["1.2.3.4"])
+    test.api_rr_add(None, SAMPLE_TLD, record)
+    assert gdomain_rr_set.call_count == 0
+    out, __ = capsys.readouterr()
+    assert "already up to date" in out
+
+
+@patch(PACKAGE + "is_verbose")
+@patch(PACKAGE + "gdomain_rr_ls")
+@patch(PACKAGE + "gdomain_rr_set")
+@patch(PACKAGE + "gdomain_rr_del")
+def test_api_rr_del(gdomain_rr_del, gdomain_rr_set, gdomain_rr_ls, is_verbose, capsys):
+    """ Test api_rr_del
+    """
+    is_verbose.return_value = False
+    gdomain_rr_ls.return_value = {("@", "A"): APEX}
+
+    # Removes one value, the rest of the set gets rewritten
+    test.api_rr_del(None, SAMPLE_TLD, test.ResourceRecord("@", "A", 0, ["1.2.3.4"]))
+    assert gdomain_rr_set.call_args[0][2].data == ["5.6.7.8"]
+    assert gdomain_rr_del.call_count == 0
+    reset_mocks(gdomain_rr_del, gdomain_rr_set)
+
+    # No values, the whole set goes
+    test.api_rr_del(None, SAMPLE_TLD, test.ResourceRecord("@", "A", 0, []))
+    assert gdomain_rr_set.call_count == 0
+    assert gdomain_rr_del.call_count == 1
+    reset_mocks(gdomain_rr_del, gdomain_rr_set)
+
+    # Not found
+    test.api_rr_del(None, SAMPLE_TLD, test.ResourceRecord("nope", "A", 0, []))
+    assert gdomain_rr_set.call_count == 0
+    assert gdomain_rr_del.call_count == 0
+    out, __ = capsys.readouterr()
+    assert "Record not found" in out
+
+
+@patch(PACKAGE + "is_verbose")
+@patch(PACKAGE + "gdomain_rr_ls")
+@patch(PACKAGE + "gdomain_rr_set")
+@patch(PACKAGE + "gdomain_rr_del")
+def test_api_rr_sync(
+    gdomain_rr_del, gdomain_rr_set, gdomain_rr_ls, is_verbose, tmp_path, capsys
+):  # pylint: disable=too-many-arguments
+    """ Test api_rr_sync
+    """
+    path = tmp_path / "records.yaml"
+    path.write_text(
+        "- type: A\n"
+        "  data: [1.2.3.4, 5.6.7.8]\n"
+        "- name: txt\n"
+        "  type: TXT\n"
+        "  ttl: 5m\n"
+        "  data: v=spf1 -all\n"
+    )
+    is_verbose.return_value = False
+    gdomain_rr_ls.return_value = {("@", "A"): APEX, ("www", "CNAME"): WWW}
+
+    test.api_rr_sync(None, SAMPLE_TLD, str(path))
+    assert gdomain_rr_set.call_count == 1
+    assert gdomain_rr_set.call_args[0][2] == test.ResourceRecord(
+        "txt", "TXT", 300, ["v=spf1 -all"]
+    )
+    assert gdomain_rr_del.call_count == 1
+    assert gdomain_rr_del.call_args[0][2] == WWW
+    out, __ = capsys.readouterr()
+    assert "1 set, 1 deleted, 1 unchanged" in out
+
+
+def test_gdomain_rr_ls_replay():
+    """ Test gdomain_rr_ls against the fixture
+    """
+    response = test.gdomain_rr_ls(load_replay(), SAMPLE_TLD)
+    assert response == {("@", "A"): APEX, ("www", "CNAME"): WWW}
+
+
+def test_gdomain_rr_set_replay():
+    """ Test gdomain_rr_set of a new record set against the fixture
+    """
+    browser = load_replay()
+    record = test.ResourceRecord("api", "AAAA", 60, ["::1"])
+    test.gdomain_rr_set(browser, SAMPLE_TLD, record, False)
+    assert [x[1] for x in browser.fills] == ["api", "AAAA", "60", "::1"]
+    assert browser.clicks[-1].text == "Add"
+
+    # The fixture's add form only has one data input
+    with pytest.raises(RuntimeError):
+        test.gdomain_rr_set(browser, SAMPLE_TLD, APEX._replace(name="two"), False)
+
+
+def test_gdomain_rr_del_replay():
+    """ Test gdomain_rr_del against the fixture
+    """
+    browser = load_replay()
+    test.gdomain_rr_del(browser, SAMPLE_TLD, WWW)
+
+    # the row's delete button, then the modal's
+    row_delete, modal_delete = browser.clicks
+    row = row_delete._element.getparent().getparent()  # pylint: disable=protected-access
+    form = modal_delete._element.getparent()  # pylint: disable=protected-access
+    assert "www" in row.text_content()
+    assert "resource record" in form.text_content()
+
+    # Not there
+    with pytest.raises(RuntimeError):
+        test.gdomain_rr_del(browser, SAMPLE_TLD, WWW._replace(type="A"))
+
+
+def test_ttl_seconds():
+    """ Test ttl_seconds
+    """
+    assert test.ttl_seconds("1h") == 3600
+    assert test.ttl_seconds(" 5M ") == 300
+    assert test.ttl_seconds("1d") == 86400
+    assert test.ttl_seconds("600") == 600
+
+
+def test_normalize_record():
+    """ Test normalize_record and relative_name
+    """
+    for name in ["", "@", SAMPLE_TLD, f"{SAMPLE_TLD}."]:
+        record = test.ResourceRecord(name, "txt", 0, [])
+        assert test.normalize_record(record, SAMPLE_TLD).name == "@"
+
+    record = test.ResourceRecord(f"www.{SAMPLE_TLD}", "a", 0, [])
+    assert test.normalize_record(record, SAMPLE_TLD) == ("www", "A", 0, [])
+
+    with pytest.raises(RuntimeError):
+        test.normalize_record(record._replace(type="SRV"), SAMPLE_TLD)
+
+
+def load_replay():
+    """ Returns an in-process browser of the DNS page fixture
+    """
+    pytest.importorskip("lxml")
+    return load_fixture(FIXTURE)
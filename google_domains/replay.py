@@ -0,0 +1,220 @@
+"""
+    Record/replay of DOM fixtures
+
+    Records the registrar's DNS page once, scrubbed of secrets, so the DOM-walking
+    code in api.py can be exercised offline. Fixtures can be replayed either:
+        1. In a real headless browser, via a file:// URL (replay_browser)
+        2. In-process, parsed with lxml (load_fixture). No browser, no network
+
+    The in-process ReplayBrowser implements the subset of the splinter API that api.py uses
+"""
+import os.path
+import re
+from typing import List, Optional
+from splinter import Browser
+from splinter.element_list import ElementList
+from google_domains.log import debug
+
+
+# Replaces every scrubbed secret
+REDACTED = "REDACTED"
+
+# Anything that looks like an email address
+EMAIL_REGEX = re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+")
+
+# Script and style blocks carry session state and tokens. Never needed for replay
+SCRIPT_REGEX = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+
+# Values typed into inputs, ie: passwords that were filled in
+VALUE_REGEX = re.compile(r'\svalue="[^"]*"', re.IGNORECASE)
+
+
+def scrub_html(html: str, secrets: List[str]) -> str:
+    """ Returns the html, minus the passed-in secrets, emails, scripts and input values
+    """
+    ret = SCRIPT_REGEX.sub("", html)
+    ret = VALUE_REGEX.sub("", ret)
+
+    # longest first, so a secret that contains another is fully removed
+    for secret in sorted([x for x in secrets if x], key=len, reverse=True):
+        ret = ret.replace(secret, REDACTED)
+
+    return EMAIL_REGEX.sub(REDACTED, ret)
+
+
+def record_fixture(browser: Browser, path: str, secrets: List[str]) -> None:
+    """ Saves the browser's current DOM to the path, scrubbed of the secrets
+    """
+    html = scrub_html(browser.html, secrets)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(html)
+
+    debug(f" record: {path}")
+
+
+def replay_browser(path: str, browser_name: str = "firefox") -> Browser:
+    """ Returns a headless browser, with the fixture loaded
+    """
+    browser = Browser(browser_name, headless=True)
+    browser.visit(f"file://{os.path.abspath(path)}")
+    return browser
+
+
+def load_fixture(path: str) -> "ReplayBrowser":
+    """ Returns an in-process ReplayBrowser of the fixture at the path
+    """
+    with open(path, encoding="utf-8") as file:
+        return ReplayBrowser(file.read(), url=f"file://{os.path.abspath(path)}")
+
+
+class ReplayElement:
+    """ An lxml-backed stand-in for splinter's WebDriverElement
+    """
+
+    def __init__(self, element, browser: "ReplayBrowser") -> None:
+        self._element = element
+        self._browser = browser
+
+    def __getitem__(self, attribute: str) -> Optional[str]:
+        return self._element.get(attribute)
+
+    @property
+    def tag_name(self) -> str:
+        """ The element's tag
+        """
+        return self._element.tag
+
+    @property
+    def html(self) -> str:
+        """ The inner html
+        """
+        children = "".join(self._browser.serialize(x, True) for x in self._element)
+        return (self._element.text or "") + children
+
+    @property
+    def outer_html(self) -> str:
+        """ The element's html, including itself
+        """
+        return self._browser.serialize(self._element, False)
+
+    @property
+    def text(self) -> str:
+        """ The element's text, whitespace-normalized like a browser would render it
+        """
+        return " ".join(self._element.text_content().split())
+
+    @property
+    def value(self) -> Optional[str]:
+        """ The element's value attribute
+        """
+        return self["value"]
+
+    @property
+    def visible(self) -> bool:
+        """ False if this element, or any of its ancestors, is hidden
+        """
+        element = self._element
+        while element is not None:
+            style = (element.get("style") or "").replace(" ", "")
+            if "display:none" in style or element.get("hidden") is not None:
+                return False
+            element = element.getparent()
+        return True
+
+    def fill(self, value: str) -> None:
+        """ Sets the value of the input
+        """
+        self._element.set("value", value)
+        self._browser.fills.append((self, value))
+
+    def select(self, value: str) -> None:
+        """ Selects the option with the value
+        """
+        self._browser.fills.append((self, value))
+
+    def click(self) -> None:
+        """ Records the click. The DOM is static, so nothing else happens
+        """
+        self._browser.clicks.append(self)
+
+    def find_by_xpath(self, xpath: str) -> ElementList:
+        """ Finds elements by xpath. Like selenium, "//" searches the whole document
+        """
+        return self._browser.wrap(self._element.xpath(xpath), "xpath", xpath)
+
+    def find_by_tag(self, tag: str) -> ElementList:
+        """ Finds descendant elements by tag
+        """
+        return self._browser.wrap(self._element.iterdescendants(tag), "tag", tag)
+
+    def find_by_text(self, text: str) -> ElementList:
+        """ Finds descendant elements by their exact text
+        """
+        elements = self._element.xpath(".//*[text()=$text]", text=text)
+        return self._browser.wrap(elements, "text", text)
+
+    def find_by_id(self, the_id: str) -> ElementList:
+        """ Finds descendant elements by id
+        """
+        elements = self._element.xpath(".//*[@id=$id]", id=the_id)
+        return self._browser.wrap(elements, "id", the_id)
+
+    def find_by_name(self, name: str) -> ElementList:
+        """ Finds descendant elements by name
+        """
+        elements = self._element.xpath(".//*[@name=$name]", name=name)
+        return self._browser.wrap(elements, "name", name)
+
+
+class ReplayBrowser(ReplayElement):
+    """ An in-process, lxml-backed stand-in for splinter's Browser
+        Clicks and fills are recorded, so tests can assert on them
+    """
+
+    def __init__(self, html: str, url: str = "about:blank") -> None:
+        # NOTE: lxml is only needed for offline replay. Dont make everyone install it
+        from lxml import etree  # pylint: disable=import-outside-toplevel
+        from lxml.html import document_fromstring  # pylint: disable=import-outside-toplevel
+
+        self._etree = etree
+        self.url = url
+        self.clicks: List[ReplayElement] = []
+        self.fills: List[tuple] = []
+        super().__init__(document_fromstring(html), self)
+
+    @property
+    def html(self) -> str:
+        """ The whole document
+        """
+        return self.serialize(self._element, False)
+
+    def serialize(self, element, with_tail: bool) -> str:
+        """ Returns the element as an html string
+        """
+        return self._etree.tostring(
+            element, encoding="unicode", method="html", with_tail=with_tail
+        )
+
+    def wrap(self, elements, find_by: str, query: str) -> ElementList:
+        """ Returns an ElementList of ReplayElements, like splinter does
+        """
+        wrapped = [
+            ReplayElement(x, self)
+            for x in elements
+            if isinstance(x.tag, str)  # skips comments and processing instructions
+        ]
+        return ElementList(wrapped, find_by=find_by, query=query)
+
+    def visit(self, url: str) -> None:
+        """ Only records the visit. Fixtures are single pages
+        """
+        self.url = url
+
+    def quit(self) -> None:
+        """ Nothing to clean up
+        """
@@ -0,0 +1,73 @@
+"""
+    Tests for replay
+"""
+import os.path
+from mock import MagicMock
+import pytest
+from google_domains import replay as test
+
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "dns.html")
+
+
+def test_scrub_html():
+    """ Tests scrub_html
+    """
+    html = (
+        "<div>hunter2 ping@example.com</div>"
+        '<input name="password" value="hunter2">'
+        "<script>var token = 'abc';</script>"
+        "<div>foo_username</div>"
+    )
+    response = test.scrub_html(html, ["hunter2", "foo_username", ""])
+    assert "hunter2" not in response
+    assert "foo_username" not in response
+    assert "example.com" not in response
+    assert "token" not in response
+    assert "value=" not in response
+    assert test.REDACTED in response
+
+
+def test_record_fixture(tmp_path):
+    """ Tests record_fixture
+    """
+    browser = MagicMock(html="<div>secret stuff</div>")
+    path = str(tmp_path / "subdir" / "page.html")
+
+    test.record_fixture(browser, path, ["secret"])
+    with open(path, encoding="utf-8") as file:
+        contents = file.read()
+    assert "secret" not in contents
+    assert "stuff" in contents
+
+
+def test_replay_browser():
+    """ Tests the in-process ReplayBrowser
+    """
+    pytest.importorskip("lxml")
+    browser = test.load_fixture(FIXTURE)
+    assert browser.url.startswith("file://")
+
+    # finding by tag, text and xpath
+    h3s = browser.find_by_tag("h3")
+    assert len(h3s) == 4
+    assert h3s.first.text == "Custom resource records"
+    assert browser.find_by_text("Add").first.tag_name == "button"
+    assert not browser.find_by_xpath("//h3[contains(text(), 'nope')]")
+
+    # visibility, via an ancestor's style
+    dismisses = browser.find_by_xpath("//a")
+    assert [x.visible for x in dismisses] == [False, True]
+
+    # html vs outer_html
+    record = browser.find_by_xpath("//div[contains(text(), 'baz.foobar.com')]").first
+    assert record.html == "baz.foobar.com → https://dweeb.com"
+    assert record.outer_html.startswith("<div>")
+
+    # fills and clicks get recorded
+    subdomain = browser.find_by_xpath("//input").first
+    subdomain.fill("foo")
+    subdomain.click()
+    assert subdomain.value == "foo"
+    assert browser.fills == [(subdomain, "foo")]
+    assert browser.clicks == [subdomain]
@@ -0,0 +1,307 @@
+"""
+    In-page scripts
+
+    Each script is a function body that reads its args from `arguments`, so the same
+    script runs through WebDriver's execute_script, or the CDP backend's.
+    One script call replaces the many fine-grained element calls it would take otherwise
+"""
+
+# Shared helpers, prepended to every script
+PRELUDE = """
+var sectionOf = function (title) {
+    var h3s = document.getElementsByTagName("h3");
+    for (var i = 0; i < h3s.length; i++) {
+        if (h3s[i].textContent.indexOf(title) >= 0) {
+            return h3s[i].parentNode;
+        }
+    }
+    return null;
+};
+var firstText = function (element) {
+    for (var i = 0; i < element.childNodes.length; i++) {
+        if (element.childNodes[i].nodeType === 3) {
+            return element.childNodes[i].nodeValue;
+        }
+    }
+    return "";
+};
+var isVisible = function (element) {
+    return !!(element.offsetWidth || element.offsetHeight || element.getClientRects().length);
+};
+var hasOwnText = function (element, text) {
+    for (var i = 0; i < element.childNodes.length; i++) {
+        var node = element.childNodes[i];
+        if (node.nodeType === 3 && node.nodeValue.trim() === text) {
+            return true;
+        }
+    }
+    return false;
+};
+var findByText = function (scope, tag, text) {
+    var elements = (scope || document).getElementsByTagName(tag);
+    for (var i = 0; i < elements.length; i++) {
+        if (hasOwnText(elements[i], text)) {
+            return elements[i];
+        }
+    }
+    return null;
+};
+var findContaining = function (scope, tag, text) {
+    var elements = (scope || document).getElementsByTagName(tag);
+    for (var i = 0; i < elements.length; i++) {
+        if (elements[i].innerHTML.indexOf(text) >= 0) {
+            return elements[i];
+        }
+    }
+    return null;
+};
+var recordRow = function (hostname) {
+    var section = sectionOf("Synthetic records");
+    var divs = section ? section.getElementsByTagName("div") : [];
+    for (var i = 0; i < divs.length; i++) {
+        if (firstText(divs[i]).indexOf(hostname) >= 0) {
+            return divs[i].parentNode.parentNode;
+        }
+    }
+    return null;
+};
+var setValue = function (element, value) {
+    element.focus();
+    element.value = value;
+    element.dispatchEvent(new Event("input", {bubbles: true}));
+    element.dispatchEvent(new Event("change", {bubbles: true}));
+};
+"""
+
+# args: domain, optional hostname regex, optional target regex
+# Returns the innerHTML of every "Synthetic records" div whose text mentions the domain.
+# The same divs gdomain_ls finds by xpath. With regexes, only the rows that match them.
+# The hostname regex can match the full hostname, or the one relative to the domain
+SYNTHETIC_RECORDS_HTML = (
+    PRELUDE
+    + """
+var domain = arguments[0];
+var hostnameRegex = arguments[1] ? new RegExp(arguments[1]) : null;
+var targetRegex = arguments[2] ? new RegExp(arguments[2]) : null;
+var section = sectionOf("Synthetic records");
+if (!section) {
+    return [];
+}
+var ret = [];
+var divs = section.getElementsByTagName("div");
+for (var i = 0; i < divs.length; i++) {
+    if (firstText(divs[i]).indexOf(domain) < 0) {
+        continue;
+    }
+    var html = divs[i].innerHTML;
+    var words = html.trim().split(/\\s+/);
+    var hostname = words[0];
+    var relative = hostname.replace("." + domain, "");
+    if (hostnameRegex && !hostnameRegex.test(hostname) && !hostnameRegex.test(relative)) {
+        continue;
+    }
+    if (targetRegex && !targetRegex.test(words[words.length - 1])) {
+        continue;
+    }
+    ret.push(html);
+}
+return ret;
+"""
+)
+
+# args: section title
+# Returns a cheap fingerprint of the section's text, a 32-bit FNV-1a hash and the length.
+# Returns null if the section isnt there
+SECTION_FINGERPRINT = (
+    PRELUDE
+    + """
+var section = sectionOf(arguments[0]);
+if (!section) {
+    return null;
+}
+var text = section.textContent;
+var hash = 0x811c9dc5;
+for (var i = 0; i < text.length; i++) {
+    hash ^= text.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+}
+return (hash >>> 0).toString(16) + ":" + text.length;
+"""
+)
+
+# args: error signals, lowercase
+# Returns the [signal, message] of the save outcome showing, like api.get_outcome, or null.
+# Failures win over success
+MUTATION_OUTCOME = (
+    PRELUDE
+    + """
+var signals = arguments[0];
+var isError = function (text) {
+    text = text.toLowerCase();
+    for (var i = 0; i < signals.length; i++) {
+        if (text.indexOf(signals[i]) >= 0) {
+            return true;
+        }
+    }
+    return false;
+};
+var inputs = document.querySelectorAll("input[aria-invalid='true']");
+for (var i = 0; i < inputs.length; i++) {
+    if (isVisible(inputs[i])) {
+        return ["invalid", inputs[i].placeholder || inputs[i].name || ""];
+    }
+}
+var ret = null;
+var elements = document.querySelectorAll("[role='alert'], a");
+for (var j = 0; j < elements.length; j++) {
+    var element = elements[j];
+    if (!isVisible(element)) {
+        continue;
+    }
+    if (element.tagName === "A") {
+        if (element.textContent.indexOf("Dismiss") < 0) {
+            continue;
+        }
+        element = element.parentNode;
+    }
+    var text = element.textContent.trim().replace(/\\s+/g, " ");
+    if (isError(text)) {
+        return ["error", text];
+    }
+    if (text.indexOf("Dismiss") >= 0) {
+        ret = ["success", text];
+    }
+}
+return ret;
+"""
+)
+
+# args: tag, substring
+# Returns true if a visible element of the tag contains the substring
+ELEMENT_VISIBLE = (
+    PRELUDE
+    + """
+var elements = document.getElementsByTagName(arguments[0]);
+for (var i = 0; i < elements.length; i++) {
+    if (elements[i].innerHTML.indexOf(arguments[1]) >= 0 && isVisible(elements[i])) {
+        return true;
+    }
+}
+return false;
+"""
+)
+
+# args: hostname, target
+# Fills in and submits the "Synthetic records" add form. Returns false if the form is missing
+ADD_SYNTHETIC_RECORD = (
+    PRELUDE
+    + """
+var section = sectionOf("Synthetic records");
+if (!section) {
+    return false;
+}
+var inputs = section.getElementsByTagName("input");
+var subdomain = null, destination = null;
+for (var i = 0; i < inputs.length; i++) {
+    if (inputs[i].placeholder === "Subdomain") { subdomain = inputs[i]; }
+    if (inputs[i].placeholder === "Destination URL") { destination = inputs[i]; }
+}
+if (!subdomain || !destination) {
+    return false;
+}
+setValue(subdomain, arguments[0]);
+setValue(destination, arguments[1]);
+
+var labels = ["Temporary redirect (302)", "Forward path", "Enable SSL", "Add"];
+for (var j = 0; j < labels.length; j++) {
+    var element = findByText(section, "*", labels[j]);
+    if (!element) {
+        return false;
+    }
+    element.click();
+}
+return true;
+"""
+)
+
+# args: hostname
+# Clicks the Delete button of the hostname's record row. Returns false if its not there
+CLICK_RECORD_DELETE = (
+    PRELUDE
+    + """
+var row = recordRow(arguments[0]);
+var button = row && findContaining(row, "button", "Delete");
+if (!button) {
+    return false;
+}
+button.click();
+return true;
+"""
+)
+
+# args: form title, button text
+# Clicks the button in the modal form with the title. Returns false if its not there
+CLICK_MODAL_BUTTON = (
+    PRELUDE
+    + """
+var form = findContaining(document, "form", arguments[0]);
+var button = form && findContaining(form, "button", arguments[1]);
+if (!button) {
+    return false;
+}
+button.click();
+return true;
+"""
+)
+
+# args: tag, text
+# Clicks the first visible element of the tag with exactly the text
+CLICK_BY_TEXT = (
+    PRELUDE
+    + """
+var elements = document.getElementsByTagName(arguments[0]);
+for (var i = 0; i < elements.length; i++) {
+    if (elements[i].textContent.trim() === arguments[1] && isVisible(elements[i])) {
+        elements[i].click();
+        return true;
+    }
+}
+return false;
+"""
+)
+
+# args: css selector
+# Returns true if the element exists, and is visible
+SELECTOR_VISIBLE = (
+    PRELUDE
+    + """
+var element = document.querySelector(arguments[0]);
+return !!element && isVisible(element);
+"""
+)
+
+# args: css selector
+# Focuses and clears the element, so typed text replaces its value
+FOCUS = """
+var element = document.querySelector(arguments[0]);
+if (!element) {
+    return false;
+}
+element.focus();
+element.value = "";
+return true;
+"""
+
+# args: tag, substring
+# Clicks the first element of the tag that contains the substring
+CLICK_CONTAINING = (
+    PRELUDE
+    + """
+var element = findContaining(document, arguments[0], arguments[1]);
+if (!element) {
+    return false;
+}
+element.click();
+return true;
+"""
+)
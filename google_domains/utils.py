@@ -2,11 +2,16 @@
     Shared utilities
 """
 from functools import wraps
+import os
 import time
 from fqdn import FQDN
 from google_domains.log import debug
 
 
+# Where local state (history, caches, indexes) lives. Override with GOOGLE_DOMAINS_STATE_DIR
+STATE_DIR = "~/.google-domains"
+
+
 class Timer:
     """ Lets us time a block. Like: with Timer('doing something interesting'):
     """
@@ -70,3 +75,11 @@ def un_fqdn(hostname: str, domain: str) -> str:
     ret = hostname.replace(domain, "")
     ret = ret.strip(".")
     return ret
+
+
+def get_state_path(filename: str) -> str:
+    """ Returns the path of the file in the local state directory, creating the directory
+    """
+    directory = os.path.expanduser(os.environ.get("GOOGLE_DOMAINS_STATE_DIR", STATE_DIR))
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)
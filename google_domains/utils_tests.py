@@ -59,3 +59,14 @@ def test_un_fqdn():
     assert test.un_fqdn("foo.bar.com.", domain) == "foo"
     assert test.un_fqdn("foo", domain) == "foo"
     assert test.un_fqdn("foo.", domain) == "foo"
+
+
+def test_get_state_path(tmp_path, monkeypatch):
+    """ Tests get_state_path
+    """
+    directory = tmp_path / "state"
+    monkeypatch.setenv("GOOGLE_DOMAINS_STATE_DIR", str(directory))
+
+    response = test.get_state_path("foo.json")
+    assert response == str(directory / "foo.json")
+    assert directory.is_dir()
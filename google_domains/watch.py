@@ -0,0 +1,112 @@
+"""
+    Watches the synthetic records for changes, from one long-lived session
+
+    Each poll reloads the DNS page, and compares a cheap in-page fingerprint of the
+    "Synthetic records" section. Only when the fingerprint changes does it list the
+    records, and print what changed as NDJSON events, one per line:
+
+        {"event": "added", "hostname": "foo.bar.com", "target": "https://foo.com", "at": 1600000000}
+        {"event": "changed", "hostname": "foo.bar.com", "target": "https://baz.com", "previous": "https://foo.com", "at": 1600000060}
+        {"event": "removed", "hostname": "foo.bar.com", "target": "https://baz.com", "at": 1600000120}
+"""  # noqa  # pylint: disable=line-too-long
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+from selenium.common.exceptions import WebDriverException
+from splinter import Browser
+from google_domains.api import gdomain_fingerprint, gdomain_ls, gdomain_reload
+from google_domains.inventory import record_snapshot
+from google_domains.lifecycle import BrowserLifecycle
+from google_domains.log import debug, error
+
+
+# How often to poll, by default
+DEFAULT_INTERVAL_SECONDS = 60
+
+# Type aliases
+Records = Dict[str, str]
+Event = Dict[str, Any]
+
+
+def api_watch(
+    lifecycle: BrowserLifecycle,
+    domain: str,
+    interval: float = DEFAULT_INTERVAL_SECONDS,
+    iterations: int = 0,
+) -> None:
+    """ Polls for changes until interrupted, or for a number of iterations if its not 0
+        Failed polls are logged, and the next one starts from a fresh session
+    """
+    fingerprint: Optional[str] = None
+    records: Optional[Records] = None
+    polls = 0
+
+    try:
+        while True:
+            started = time.time()
+            try:
+                with lifecycle.operation() as browser:
+                    fingerprint, records = poll(browser, domain, fingerprint, records)
+            except WebDriverException as e:
+                error(f"Poll failed: {e}")
+
+            polls += 1
+            if iterations and polls >= iterations:
+                return
+            time.sleep(max(0.0, interval - (time.time() - started)))
+
+    except KeyboardInterrupt:
+        return
+
+
+def poll(
+    browser: Browser, domain: str, fingerprint: Optional[str], records: Optional[Records]
+) -> Tuple[Optional[str], Records]:
+    """ One poll. Returns the new fingerprint and records
+        The first poll just takes a baseline, and emits nothing
+    """
+    if records is not None:
+        gdomain_reload(browser)
+
+    new_fingerprint = gdomain_fingerprint(browser)
+    if records is not None and new_fingerprint and new_fingerprint == fingerprint:
+        debug(f"  watch: unchanged {new_fingerprint}")
+        return fingerprint, records
+
+    new_records = gdomain_ls(browser, domain)
+    record_snapshot(domain, new_records)
+    if records is not None:
+        for event in diff_records(records, new_records):
+            emit_event(event)
+
+    return new_fingerprint, new_records
+
+
+def diff_records(old: Records, new: Records) -> List[Event]:
+    """ Returns the added, removed, and changed records, in hostname order
+    """
+    ret = []
+    for hostname in sorted(set(old) | set(new)):
+        if hostname not in old:
+            ret.append({"event": "added", "hostname": hostname, "target": new[hostname]})
+        elif hostname not in new:
+            ret.append({"event": "removed", "hostname": hostname, "target": old[hostname]})
+        elif old[hostname] != new[hostname]:
+            ret.append(
+                {
+                    "event": "changed",
+                    "hostname": hostname,
+                    "target": new[hostname],
+                    "previous": old[hostname],
+                }
+            )
+    return ret
+
+
+def emit_event(event: Event, stream: Optional[TextIO] = None) -> None:
+    """ Writes the event as one line of JSON, right away
+    """
+    stream = stream or sys.stdout
+    stream.write(json.dumps({**event, "at": int(time.time())}) + "\n")
+    stream.flush()
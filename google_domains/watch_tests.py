@@ -0,0 +1,81 @@
+"""
+    Tests for watch
+"""
+import json
+from mock import MagicMock, patch  # create_autospec
+from selenium.common.exceptions import WebDriverException
+from google_domains import watch as test
+
+
+PACKAGE = "google_domains.watch."
+SAMPLE_TLD = "foobar.com"
+
+
+def test_diff_records():
+    """ Tests diff_records
+    """
+    old = {"a.foobar.com": "https://a.com", "b.foobar.com": "https://b.com"}
+    new = {"b.foobar.com": "https://bb.com", "c.foobar.com": "https://c.com"}
+
+    response = test.diff_records(old, new)
+    assert response == [
+        {"event": "removed", "hostname": "a.foobar.com", "target": "https://a.com"},
+        {
+            "event": "changed",
+            "hostname": "b.foobar.com",
+            "target": "https://bb.com",
+            "previous": "https://b.com",
+        },
+        {"event": "added", "hostname": "c.foobar.com", "target": "https://c.com"},
+    ]
+    assert not test.diff_records(new, new)
+
+
+@patch(PACKAGE + "record_snapshot")
+@patch(PACKAGE + "time.sleep")
+@patch(PACKAGE + "gdomain_reload")
+@patch(PACKAGE + "gdomain_ls")
+@patch(PACKAGE + "gdomain_fingerprint")
+def test_api_watch(
+    gdomain_fingerprint, gdomain_ls, gdomain_reload, sleep, record_snapshot, capsys
+):  # pylint: disable=too-many-arguments
+    """ Tests api_watch. Only lists when the fingerprint changes
+    """
+    lifecycle = MagicMock()
+    gdomain_fingerprint.side_effect = ["aaa", "aaa", "bbb", "bbb"]
+    gdomain_ls.side_effect = [
+        {"a.foobar.com": "https://a.com"},
+        {"a.foobar.com": "https://a.com", "b.foobar.com": "https://b.com"},
+    ]
+
+    test.api_watch(lifecycle, SAMPLE_TLD, interval=10, iterations=4)
+    assert lifecycle.operation.call_count == 4
+    assert gdomain_reload.call_count == 3  # not the baseline
+    assert gdomain_ls.call_count == 2  # the baseline, and the change
+    assert sleep.call_count == 3
+    assert record_snapshot.call_count == 2
+
+    out, __ = capsys.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 1
+    event = json.loads(lines[0])
+    assert event["event"] == "added"
+    assert event["hostname"] == "b.foobar.com"
+    assert "at" in event
+
+
+@patch(PACKAGE + "time.sleep")
+@patch(PACKAGE + "poll")
+def test_api_watch_errors(poll, sleep, capsys):
+    """ Tests that failed polls dont stop the watch, and that ^C does
+    """
+    poll.side_effect = [WebDriverException("gone"), ("aaa", {}), KeyboardInterrupt()]
+
+    test.api_watch(MagicMock(), SAMPLE_TLD, interval=10)
+    assert poll.call_count == 3
+    assert sleep.call_count == 2
+
+    # the failed poll didnt lose the baseline
+    assert poll.call_args[0][2:] == ("aaa", {})
+    out, __ = capsys.readouterr()
+    assert "ERROR: Poll failed" in out